@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from os import scandir
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+# Curly quotes to their straight equivalents
+_straight_quotes = str.maketrans({"‘": "'", "’": "'", "“": '"', "”": '"'})
+
+
+def iter_json_files(root: Path) -> Iterator[Path]:
+    """Recursively yields every JSON file under `root`.
+
+    Walks the tree with `os.scandir`, whose entries carry their file type,
+    so no extra `stat` call is made per file. Symlinked directories are
+    not followed, and a missing `root` yields nothing.
+    """
+    stack: list[str | Path] = [root]
+    while stack:
+        try:
+            with scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".json"):
+                        yield Path(entry.path)
+        except FileNotFoundError:
+            continue
+
+
+def clean_llm_response(response: str) -> str:
+    """Clean common LLM inconsistencies in the response."""
+    response = response.split("</think>")[-1]
+    response = response.translate(_straight_quotes)
+    return response.strip()
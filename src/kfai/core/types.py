@@ -10,3 +10,9 @@ class TranscriptChunk(TypedDict):
 
 class CompleteVideoRecord(RawVideoRecord, VideoMetadata):
     transcript_chunks: list[TranscriptChunk] | None
+
+
+class ManifestEntry(TypedDict):
+    sha256: str
+    size: int
+    mtime_ns: int
@@ -1,17 +1,124 @@
-import json
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
 from random import uniform
-from time import sleep
+from time import monotonic, sleep
 from typing import cast
 
+import orjson
+from tqdm import tqdm
+
+from kfai.core.helpers import iter_json_files
 from kfai.core.paths import RAW_JSON_DIR
 from kfai.core.types import CompleteVideoRecord
-from kfai.extractors.utils.config import SQLITE_DB_PATH, VIDEOS_TO_SKIP_FILE
+from kfai.extractors.utils.config import (
+    FETCH_WORKERS,
+    SQLITE_DB_PATH,
+    VIDEOS_TO_SKIP_FILE,
+)
 from kfai.extractors.utils.helpers.database import (
     create_local_sqlite_db,
     get_video_db_data,
 )
 from kfai.extractors.utils.helpers.processing import process_video
 from kfai.extractors.utils.helpers.youtube import get_youtube_data
+from kfai.extractors.utils.types import RawVideoRecord, VideoMetadata
+
+
+def _save_videos_to_skip(video_ids: set[str]) -> None:
+    """Writes the full set of video IDs to skip to the skip file."""
+    try:
+        with VIDEOS_TO_SKIP_FILE.open("wb") as f:
+            f.write(orjson.dumps(list(video_ids)))
+    except OSError as e:
+        print(
+            f"FATAL: Could not write to log file {VIDEOS_TO_SKIP_FILE}."
+            f" Error: {e}"
+        )
+
+
+def _fetch_video(
+    video_record: CompleteVideoRecord, videos_ids_to_skip: set[str]
+) -> None:
+    """Processes a single video, recording it to be skipped if needed."""
+    if process_video(video_record):
+        videos_ids_to_skip.add(video_record["video_id"])
+
+
+def _process_videos(
+    new_video_metadata: list[RawVideoRecord],
+    youtube_api_data: dict[str, VideoMetadata],
+    videos_ids_to_skip: set[str],
+) -> None:
+    """Processes videos on a thread pool, starting them rate-limited.
+
+    Transcript fetches overlap, but each one still starts on the rate
+    limiter's schedule. Videos that should be skipped next run are added
+    to `videos_ids_to_skip`.
+    """
+    next_request_at = 0.0
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as executor:
+        pending: set[Future[None]] = set()
+        try:
+            # Process and save
+            for video in new_video_metadata:
+                video_id = video["video_id"]
+
+                if video_id in videos_ids_to_skip:
+                    continue
+
+                if video_id not in youtube_api_data:
+                    tqdm.write(
+                        "Warning: Could not find YouTube API data for new"
+                        f" video ID: {video_id}"
+                    )
+                    continue
+
+                # Merge the DB data with the YouTube API data
+                video_record = cast(
+                    CompleteVideoRecord,
+                    dict(video) | youtube_api_data[video_id],
+                )
+
+                # Wait for a free worker so the video starts as soon as
+                # it's submitted, surfacing errors from finished videos
+                done, pending = wait(
+                    pending,
+                    timeout=None if len(pending) >= FETCH_WORKERS else 0,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    future.result()
+
+                # Rate limiting: start requests 2 to 4 seconds apart,
+                # counting time spent since the previous start
+                sleep_duration = next_request_at - monotonic()
+                if sleep_duration > 0:
+                    tqdm.write(
+                        f"   ...waiting for {sleep_duration:.2f}"
+                        " seconds to avoid rate-limiting."
+                    )
+                    sleep(sleep_duration)
+                next_request_at = monotonic() + uniform(2, 4)
+
+                # Process video
+                tqdm.write(f"Processing video: {video_id}")
+                pending.add(
+                    executor.submit(
+                        _fetch_video, video_record, videos_ids_to_skip
+                    )
+                )
+
+            for future in as_completed(pending):
+                future.result()
+        except BaseException:
+            # Don't start any queued videos after a failure
+            executor.shutdown(cancel_futures=True)
+            raise
 
 
 def run() -> None:
@@ -19,14 +126,14 @@ def run() -> None:
 
     if VIDEOS_TO_SKIP_FILE.exists():
         try:
-            with VIDEOS_TO_SKIP_FILE.open("r", encoding="utf-8") as f:
-                video_list = json.load(f)
+            with VIDEOS_TO_SKIP_FILE.open("rb") as f:
+                video_list = orjson.loads(f.read())
                 videos_ids_to_skip = set(video_list)
             print(
                 f"-> Found and loaded {len(videos_ids_to_skip)} previously"
                 " processed video IDs to skip this run."
             )
-        except (OSError, json.JSONDecodeError) as e:
+        except (OSError, orjson.JSONDecodeError) as e:
             print(
                 f"-> Warning: Could not read or parse {VIDEOS_TO_SKIP_FILE}."
                 f" Starting with an empty set. Error: {e}"
@@ -55,15 +162,13 @@ def run() -> None:
 
     # Scan the output directory to see which videos have been processed
     RAW_JSON_DIR.mkdir(parents=True, exist_ok=True)
-    processed_video_ids = set()
-
-    for file_path in RAW_JSON_DIR.rglob("*.json"):
-        video_id = file_path.stem
-        processed_video_ids.add(video_id)
+    processed_video_ids = {
+        file_path.stem for file_path in iter_json_files(RAW_JSON_DIR)
+    }
 
-    # Find the difference and convert it to a tuple
+    # Find the difference without building a union of the other two sets
     new_video_ids = list(
-        db_video_ids.difference(processed_video_ids.union(videos_ids_to_skip))
+        db_video_ids.difference(processed_video_ids, videos_ids_to_skip)
     )
 
     if not new_video_ids:
@@ -78,47 +183,14 @@ def run() -> None:
         youtube_api_data = get_youtube_data(new_video_ids)
 
         if youtube_api_data is not None:
-            # Process and save
-            for video in new_video_metadata:
-                video_id = video["video_id"]
-
-                if video_id in videos_ids_to_skip:
-                    continue
-
-                if video_id in youtube_api_data:
-                    # Merge the DB data with the YouTube API data
-                    video_record = cast(
-                        CompleteVideoRecord,
-                        dict(video) | youtube_api_data[video_id],
-                    )
-
-                    # Rate limiting
-                    sleep_duration = uniform(2, 4)  # Wait 2 to 4 seconds
-                    print(
-                        f"   ...waiting for {sleep_duration:.2f} seconds to"
-                        " avoid rate-limiting."
-                    )
-                    sleep(sleep_duration)
-
-                    # Process video
-                    print(f"Processing video: {video_id}")
-                    skip_next_run = process_video(video_record)
-                    if skip_next_run:
-                        videos_ids_to_skip.add(video_id)
-                        try:
-                            with VIDEOS_TO_SKIP_FILE.open(
-                                "w", encoding="utf-8"
-                            ) as f:
-                                json.dump(list(videos_ids_to_skip), f)
-                        except OSError as e:
-                            print(
-                                "FATAL: Could not write to log"
-                                f" file {VIDEOS_TO_SKIP_FILE}. Error: {e}"
-                            )
-                else:
-                    print(
-                        "Warning: Could not find YouTube API data for new"
-                        f" video ID: {video_id}"
-                    )
+            skip_count = len(videos_ids_to_skip)
+            try:
+                _process_videos(
+                    new_video_metadata, youtube_api_data, videos_ids_to_skip
+                )
+            finally:
+                # Written once per run, even if the loop is interrupted
+                if len(videos_ids_to_skip) > skip_count:
+                    _save_videos_to_skip(videos_ids_to_skip)
 
     print("Processing complete.")
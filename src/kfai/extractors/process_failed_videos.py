@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-import json
 from typing import cast
 
+import orjson
+
 from kfai.core.types import CompleteVideoRecord
 from kfai.extractors.utils.config import (
     FAILED_VIDEOS_FILE,
@@ -15,9 +16,9 @@ from kfai.extractors.utils.helpers.youtube import get_youtube_data
 def run() -> None:
     failed_ids: list[str] = []
     try:
-        with VIDEOS_TO_SKIP_FILE.open("r", encoding="utf-8") as f:
-            failed_ids = list(json.load(f))
-    except (OSError, json.JSONDecodeError) as e:
+        with VIDEOS_TO_SKIP_FILE.open("rb") as f:
+            failed_ids = list(orjson.loads(f.read()))
+    except (OSError, orjson.JSONDecodeError) as e:
         print(
             f"-> Warning: Could not read or parse {VIDEOS_TO_SKIP_FILE}."
             f" Error: {e}"
@@ -48,8 +49,10 @@ def run() -> None:
                 )
 
         # 4. Save the complete, enriched metadata
-        with FAILED_VIDEOS_FILE.open("w", encoding="utf-8") as f:
-            json.dump(enriched_metadata, f, indent=4)
+        with FAILED_VIDEOS_FILE.open("wb") as f:
+            f.write(
+                orjson.dumps(enriched_metadata, option=orjson.OPT_INDENT_2)
+            )
 
         print(
             f"Created {FAILED_VIDEOS_FILE.name} with enriched data for"
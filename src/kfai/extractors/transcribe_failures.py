@@ -1,11 +1,12 @@
 from __future__ import annotations
 
-import json
 from datetime import date
 from typing import TYPE_CHECKING
 
+import orjson
 import whisper
 
+from kfai.core.helpers import iter_json_files
 from kfai.core.paths import RAW_JSON_DIR
 from kfai.extractors.utils.config import (
     CHUNK_THRESHOLD_SECONDS,
@@ -41,20 +42,27 @@ def run() -> None:
             print(f"Fatal: Could not load Whisper model. Error: {e}")
             return None
 
-        with FAILED_VIDEOS_FILE.open("r", encoding="utf-8") as f:
-            videos_to_process: list[CompleteVideoRecord] = json.load(f)
+        with FAILED_VIDEOS_FILE.open("rb") as f:
+            videos_to_process: list[CompleteVideoRecord] = orjson.loads(
+                f.read()
+            )
 
         size = len(videos_to_process)
 
         print(f"Found {size} videos to transcribe with Whisper.")
 
+        # Index existing outputs once instead of checking each path
+        transcribed_ids = {
+            file_path.stem for file_path in iter_json_files(RAW_JSON_DIR)
+        }
+
         for i, video_metadata in enumerate(videos_to_process):
             video_id = video_metadata["video_id"]
 
-            if video_id in SKIP_LIST:
+            # 1. Check if video is skipped or has already been transcribed
+            if video_id in SKIP_LIST or video_id in transcribed_ids:
                 continue
 
-            # 1. Check if video has already been transcribed
             published_at = video_metadata["published_at"]
             date_obj = date.fromtimestamp(published_at)
             year = str(date_obj.year)
@@ -64,9 +72,6 @@ def run() -> None:
             subdir_path.mkdir(parents=True, exist_ok=True)
             output_path = subdir_path / f"{video_id}.json"
 
-            if output_path.exists():
-                continue
-
             print(f"\n--- Processing {i + 1}/{size}: {video_id} ---")
 
             raw_transcript_data = []
@@ -111,8 +116,10 @@ def run() -> None:
             final_json_output["transcript_chunks"] = final_chunks
 
             # 6. Save the output file, creating the directory if necessary
-            with output_path.open("w", encoding="utf-8") as f:
-                json.dump(final_json_output, f, indent=4)
+            with output_path.open("wb") as f:
+                f.write(
+                    orjson.dumps(final_json_output, option=orjson.OPT_INDENT_2)
+                )
 
             print(f"  -> Successfully transcribed and saved to {output_path}")
 
@@ -15,8 +15,12 @@ MYSQL_USER = getenv("MYSQL_USER", default="")
 MYSQL_PASSWORD = getenv("MYSQL_PASSWORD", default="")
 MYSQL_DATABASE = getenv("MYSQL_DATABASE", default="")
 
+MYSQL_FETCH_SIZE = 10_000  # Rows streamed per batch during export
+
 # Local
 SQLITE_DB_NAME = getenv("SQLITE_DB_NAME", default=".sqlite")
+SQLITE_MAX_VARIABLES = 900  # Bound parameters per query, under 999 limit
+SQLITE_FETCH_SIZE = 1000  # Rows read per fetchmany call
 
 
 # Paths
@@ -25,6 +29,9 @@ VIDEOS_TO_SKIP_FILE = DATA_DIR / "skipped_videos.json"
 FAILED_VIDEOS_FILE = DATA_DIR / "failures_to_transcribe.json"
 TEMP_DATA_DIR = DATA_DIR / "temp"
 
+# Transcript fetching
+FETCH_WORKERS = 4  # Videos processed concurrently; starts are still spaced
+
 # Whisper / YoutubeDL
 WHISPER_MODEL = "medium.en"
 CHUNK_THRESHOLD_SECONDS = 7200  # 2 hour
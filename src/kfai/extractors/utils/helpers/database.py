@@ -1,38 +1,67 @@
 from __future__ import annotations
 
 import sqlite3
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Literal
 
 import mysql.connector
 
 from kfai.extractors.utils.config import (
     MYSQL_DATABASE,
+    MYSQL_FETCH_SIZE,
     MYSQL_HOST,
     MYSQL_PASSWORD,
     MYSQL_USER,
     SQLITE_DB_PATH,
+    SQLITE_FETCH_SIZE,
+    SQLITE_MAX_VARIABLES,
 )
 
 if TYPE_CHECKING:
     from kfai.extractors.utils.types import MySQLConfig, RawVideoRecord
 
 
+def _connect_sqlite(
+    isolation_level: Literal["DEFERRED", "IMMEDIATE"] | None = "DEFERRED",
+) -> sqlite3.Connection:
+    """Opens the local SQLite database with write-once, read-many pragmas."""
+    conn = sqlite3.connect(SQLITE_DB_PATH, isolation_level=isolation_level)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA cache_size=-65536")  # 64 MiB
+    return conn
+
+
 def _export_mysql_to_sqlite(mysql_config: MySQLConfig) -> None:
     """Exports relevant data from a MySQL database to an SQLite database."""
     mysql_conn, sqlite_conn = None, None
+    # A database created by a failed export is removed again, so the next
+    # run doesn't mistake an empty file for a finished export
+    is_new_db = not SQLITE_DB_PATH.exists()
+    exported = False
     try:
         # Connect to MySQL
         mysql_conn = mysql.connector.connect(**mysql_config)
-        mysql_cursor = mysql_conn.cursor(dictionary=True)
+        mysql_cursor = mysql_conn.cursor(dictionary=True, buffered=False)
 
-        # Connect to SQLite
-        sqlite_conn = sqlite3.connect(SQLITE_DB_PATH)
+        # Connect to SQLite, controlling the transaction explicitly so the
+        # tables and all inserts are committed (and synced) once
+        sqlite_conn = _connect_sqlite(isolation_level=None)
         sqlite_cursor = sqlite_conn.cursor()
-
-        # Create tables in SQLite if they don't exist
+        sqlite_cursor.execute("BEGIN IMMEDIATE")
+
+        # Rebuild the tables from scratch; secondary indexes are created
+        # after the bulk load so inserts don't maintain them row by row
+        for table in (
+            "videos_video",
+            "shows_show",
+            "hosts_host",
+            "videos_video_hosts",
+        ):
+            sqlite_cursor.execute(f"DROP TABLE IF EXISTS {table}")
         sqlite_cursor.execute(
             """
-            CREATE TABLE IF NOT EXISTS videos_video (
+            CREATE TABLE videos_video (
                 id INTEGER PRIMARY KEY,
                 video_id TEXT,
                 show_id INTEGER,
@@ -42,7 +71,7 @@ def _export_mysql_to_sqlite(mysql_config: MySQLConfig) -> None:
         )
         sqlite_cursor.execute(
             """
-            CREATE TABLE IF NOT EXISTS shows_show (
+            CREATE TABLE shows_show (
                 id INTEGER PRIMARY KEY,
                 name TEXT
             )
@@ -50,7 +79,7 @@ def _export_mysql_to_sqlite(mysql_config: MySQLConfig) -> None:
         )
         sqlite_cursor.execute(
             """
-            CREATE TABLE IF NOT EXISTS hosts_host (
+            CREATE TABLE hosts_host (
                 id INTEGER PRIMARY KEY,
                 name TEXT
             )
@@ -58,65 +87,69 @@ def _export_mysql_to_sqlite(mysql_config: MySQLConfig) -> None:
         )
         sqlite_cursor.execute(
             """
-          CREATE TABLE IF NOT EXISTS videos_video_hosts(
+          CREATE TABLE videos_video_hosts(
             video_id INTEGER,
             host_id INTEGER
           )
         """
         )
 
-        # Fetch from MySQL and insert to SQLite (videos_video)
-        mysql_cursor.execute(
-            "SELECT id, video_id, show_id, producer_id FROM videos_video WHERE"
-            " channel_id < 3"
-        )
-        videos = mysql_cursor.fetchall()
-        sqlite_cursor.executemany(
+        # Stream each table from MySQL into SQLite in batches
+        for select, insert in (
             (
+                "SELECT id, video_id, show_id, producer_id FROM videos_video"
+                " WHERE channel_id < 3",
                 "INSERT INTO videos_video VALUES (:id, :video_id, :show_id,"
-                " :producer_id)"
+                " :producer_id)",
             ),
-            videos,
-        )
-
-        # Fetch from MySQL and insert to SQLite (shows_show)
-        mysql_cursor.execute("SELECT id, name FROM shows_show")
-        shows = mysql_cursor.fetchall()
-        sqlite_cursor.executemany(
-            "INSERT INTO shows_show VALUES (:id, :name)", shows
-        )
-
-        # Fetch from MySQL and insert to SQLite (hosts_host)
-        mysql_cursor.execute("SELECT id, name FROM hosts_host")
-        hosts = mysql_cursor.fetchall()
-        sqlite_cursor.executemany(
-            "INSERT INTO hosts_host VALUES (:id, :name)", hosts
-        )
+            (
+                "SELECT id, name FROM shows_show",
+                "INSERT INTO shows_show VALUES (:id, :name)",
+            ),
+            (
+                "SELECT id, name FROM hosts_host",
+                "INSERT INTO hosts_host VALUES (:id, :name)",
+            ),
+            (
+                "SELECT video_id, host_id FROM videos_video_hosts",
+                "INSERT INTO videos_video_hosts VALUES (:video_id, :host_id)",
+            ),
+        ):
+            mysql_cursor.execute(select)
+            while rows := mysql_cursor.fetchmany(MYSQL_FETCH_SIZE):
+                sqlite_cursor.executemany(insert, rows)
 
-        # Fetch from MySQL and insert to SQLite (videos_video_hosts)
-        mysql_cursor.execute(
-            "SELECT video_id, host_id FROM videos_video_hosts"
+        # Index the columns get_video_db_data filters and joins on
+        sqlite_cursor.execute(
+            "CREATE INDEX idx_videos_video_video_id ON videos_video(video_id)"
         )
-        video_hosts = mysql_cursor.fetchall()
-        sqlite_cursor.executemany(
-            "INSERT INTO videos_video_hosts VALUES (:video_id, :host_id)",
-            video_hosts,
+        sqlite_cursor.execute(
+            "CREATE INDEX idx_videos_video_hosts_video_id"
+            " ON videos_video_hosts(video_id)"
         )
 
         # Commit changes
         sqlite_conn.commit()
+        exported = True
         print("Data exported from MySQL to SQLite successfully.")
 
     except mysql.connector.Error as err:
         print(f"Error connecting to MySQL: {err}")
+        raise
     except sqlite3.Error as err:
         print(f"Error connecting to SQLite: {err}")
+        raise
     finally:
         # Close connections
         if mysql_conn and mysql_conn.is_connected():
             mysql_conn.close()
         if sqlite_conn:
+            if not exported:
+                # Undo the partial rebuild explicitly
+                sqlite_conn.rollback()
             sqlite_conn.close()
+        if not exported and is_new_db:
+            SQLITE_DB_PATH.unlink(missing_ok=True)
 
 
 def create_local_sqlite_db() -> None:
@@ -131,6 +164,22 @@ def create_local_sqlite_db() -> None:
     _export_mysql_to_sqlite(mysql_config)
 
 
+def _collect_video_records(
+    cursor: sqlite3.Cursor, video_data: list[RawVideoRecord]
+) -> None:
+    """Appends the cursor's pending rows to video_data, a batch at a time."""
+    while rows := cursor.fetchmany():
+        video_data.extend(
+            {
+                "id": row[0],
+                "video_id": row[1],
+                "show_name": row[2],
+                "hosts": (row[3].split(",") if row[3] else []),
+            }
+            for row in rows
+        )
+
+
 def get_video_db_data(
     video_ids: list[str] | None = None,
 ) -> list[RawVideoRecord]:
@@ -141,9 +190,9 @@ def get_video_db_data(
     """
 
     # Get database data from local database
-    conn = sqlite3.connect(SQLITE_DB_PATH)
-    conn.row_factory = sqlite3.Row
+    conn = _connect_sqlite()
     cursor = conn.cursor()
+    cursor.arraysize = SQLITE_FETCH_SIZE
 
     query = """
         SELECT
@@ -155,30 +204,27 @@ def get_video_db_data(
         LEFT JOIN hosts_host hh ON vvh.host_id = hh.id
     """
 
+    video_data: list[RawVideoRecord] = []
+
     # If specific IDs are requested, add a WHERE clause
     if video_ids:
-        # Use placeholders to prevent SQL injection
-        placeholders = ",".join("?" for _ in video_ids)
-        query += f" WHERE vv.video_id IN ({placeholders})"
-        query += " GROUP BY vv.id"
-        cursor.execute(query, video_ids)
+        # Older SQLite builds cap bound parameters at 999 per statement
+        for i in range(0, len(video_ids), SQLITE_MAX_VARIABLES):
+            batch_ids = video_ids[i : i + SQLITE_MAX_VARIABLES]
+            # Use placeholders to prevent SQL injection
+            placeholders = ",".join("?" for _ in batch_ids)
+            cursor.execute(
+                f"{query} WHERE vv.video_id IN ({placeholders})"
+                " GROUP BY vv.id",
+                batch_ids,
+            )
+            _collect_video_records(cursor, video_data)
     else:
         query += " GROUP BY vv.id"
         cursor.execute(query)
+        _collect_video_records(cursor, video_data)
 
-    rows = cursor.fetchall()
     conn.close()
 
     # Return raw database data
-    video_data: list[RawVideoRecord] = []
-    for row in rows:
-        video_data.append(
-            {
-                "id": row[0],
-                "video_id": row[1],
-                "show_name": row[2],
-                "hosts": (row[3].split(",") if row[3] else []),
-            }
-        )
-
     return video_data
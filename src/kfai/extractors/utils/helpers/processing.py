@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 from datetime import date
-from json import dump
 from typing import TYPE_CHECKING
 
+from orjson import OPT_INDENT_2, dumps
+from tqdm import tqdm
+
 from kfai.core.paths import RAW_JSON_DIR
 from kfai.extractors.utils.helpers.transcript import (
     chunk_transcript_with_overlap,
@@ -11,9 +13,15 @@ from kfai.extractors.utils.helpers.transcript import (
 )
 
 if TYPE_CHECKING:
+    from pathlib import Path
+
     from kfai.core.types import CompleteVideoRecord
 
 
+# Raw output directories already created during this run
+_created_dirs: set[Path] = set()
+
+
 def process_video(video_record: CompleteVideoRecord) -> bool:
     """Processes a single video, saves to JSON."""
     video_id = video_record["video_id"]
@@ -28,7 +36,6 @@ def process_video(video_record: CompleteVideoRecord) -> bool:
         month = "unknown"
 
     subdir_path = RAW_JSON_DIR / year / month
-    subdir_path.mkdir(parents=True, exist_ok=True)
     output_path = subdir_path / f"{video_id}.json"
 
     if output_path.exists():
@@ -44,14 +51,17 @@ def process_video(video_record: CompleteVideoRecord) -> bool:
             raw_transcript_data
         )
         if not video_record["transcript_chunks"]:
-            print(
+            tqdm.write(
                 f"Warning: Transcript for {video_id} was empty after chunking."
             )
             return False  # Skip if chunking resulted in nothing
     else:
         return False
 
-    with output_path.open("w", encoding="utf-8") as f:
-        dump(video_record, f, indent=4)
+    if subdir_path not in _created_dirs:
+        subdir_path.mkdir(parents=True, exist_ok=True)
+        _created_dirs.add(subdir_path)
+    with output_path.open("wb") as f:
+        f.write(dumps(video_record, option=OPT_INDENT_2))
 
     return False
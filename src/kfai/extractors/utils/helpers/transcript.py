@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+from bisect import bisect_right
 from typing import TYPE_CHECKING
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from youtube_transcript_api import YouTubeTranscriptApi
+from tqdm import tqdm
+from youtube_transcript_api import (
+    AgeRestricted,
+    NoTranscriptFound,
+    TranscriptsDisabled,
+    YouTubeTranscriptApi,
+)
 
 if TYPE_CHECKING:
     from collections.abc import Iterable
@@ -41,52 +48,47 @@ def get_raw_transcript_data(
         yt_transcript_api = YouTubeTranscriptApi()
         fetched = yt_transcript_api.fetch(video_id=video_id, languages=["en"])
         return _normalize_transcript(fetched)
-    except Exception as e:
-        error = str(e)
-        if (
-            "Subtitles are disabled for this video" in error
-            or "This video is age-restricted" in error
-        ):
+    except (TranscriptsDisabled, AgeRestricted):
+        return video_id
+    except NoTranscriptFound:
+        try:
+            tqdm.write(
+                "  ...Non-English subtitles found, attempting workaround."
+            )
+            # Get the list of all available transcripts
+            new_transcript_list = yt_transcript_api.list(video_id)
+
+            # Find a transcript that is translatable to English
+            for transcript in new_transcript_list:
+                if transcript.is_translatable:
+                    tqdm.write(
+                        "  -> Found a translatable transcript"
+                        f" in '{transcript.language_code}'."
+                        " Translating to English."
+                    )
+
+                    trans_snippets = transcript.translate("en").fetch()
+                    response = _normalize_transcript(trans_snippets)
+                    tqdm.write(
+                        "  -> Translation and normalization successful."
+                    )
+                    return response
+
+            # If no translatable transcripts are found after checking
+            tqdm.write(
+                f"  -> No translatable transcripts found for {video_id}"
+                " - adding to skip list."
+            )
             return video_id
 
-        if "No transcripts were found" in error:
-            try:
-                print(
-                    "  ...Non-English subtitles found, attempting workaround."
-                )
-                # Get the list of all available transcripts
-                yt_transcript_api = YouTubeTranscriptApi()
-                new_transcript_list = yt_transcript_api.list(video_id)
-
-                # Find a transcript that is translatable to English
-                for transcript in new_transcript_list:
-                    if transcript.is_translatable:
-                        print(
-                            "  -> Found a translatable transcript"
-                            f" in '{transcript.language_code}'."
-                            " Translating to English."
-                        )
-
-                        trans_snippets = transcript.translate("en").fetch()
-                        response = _normalize_transcript(trans_snippets)
-                        print("  -> Translation and normalization successful.")
-                        return response
-
-                # If no translatable transcripts are found after checking
-                print(
-                    f"  -> No translatable transcripts found for {video_id}"
-                    " - adding to skip list."
-                )
-                return video_id
-
-            except Exception as e:
-                print(
-                    "  !! An error occurred during translation attempt for"
-                    f" {video_id}: {e}"
-                )
-        else:
-            print(f"Could not retrieve transcript for {video_id}")
-        return None
+        except Exception as e:
+            tqdm.write(
+                "  !! An error occurred during translation attempt for"
+                f" {video_id}: {e}"
+            )
+    except Exception:
+        tqdm.write(f"Could not retrieve transcript for {video_id}")
+    return None
 
 
 def chunk_transcript_with_overlap(
@@ -111,17 +113,23 @@ def chunk_transcript_with_overlap(
         return []
 
     # 1. Combine the transcript into a single text block and create a time map.
-    full_text = ""
-    # This list will store tuples of (character_index, timestamp)
-    char_to_time_map = []
+    text_parts: list[str] = []
+    offset = 0
+    # Parallel lists of each snippet's starting character index and timestamp
+    char_indices: list[int] = []
+    start_times: list[float] = []
 
     for snippet in transcript_data:
         start_time = snippet["start"]
         text = snippet.get("text", "").strip() + " "  # Add space for joining
 
         # Store the start time for the beginning of this snippet's text
-        char_to_time_map.append((len(full_text), start_time))
-        full_text += text
+        char_indices.append(offset)
+        start_times.append(start_time)
+        text_parts.append(text)
+        offset += len(text)
+
+    full_text = "".join(text_parts)
 
     # 2. Use a robust text splitter to create overlapping chunks.
     text_splitter = RecursiveCharacterTextSplitter(
@@ -145,19 +153,14 @@ def chunk_transcript_with_overlap(
             # This should rarely happen, search from the beginning (fallback)
             chunk_start_char_index = full_text.find(chunk_text)
 
-        # Find the closest timestamp in our map
-        chunk_start_time = None
-        for char_index, timestamp in char_to_time_map:
-            if char_index <= chunk_start_char_index:
-                chunk_start_time = timestamp
-            else:
-                break
+        # Find the closest preceding timestamp in our map
+        time_index = bisect_right(char_indices, chunk_start_char_index) - 1
 
-        if chunk_start_time is not None:
+        if time_index >= 0:
             final_chunks.append(
                 {
                     "text": " ".join(chunk_text.split()),
-                    "start": round(chunk_start_time, 2),
+                    "start": round(start_times[time_index], 2),
                 }
             )
 
@@ -2,8 +2,7 @@ from __future__ import annotations
 
 import json
 import time
-from copy import deepcopy
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Any, cast
 
 from langchain.prompts import PromptTemplate
 from langchain_core.documents import Document
@@ -15,7 +14,10 @@ from sqlalchemy import create_engine
 from kfai.loaders.utils.config import (
     COLLECTION_TABLE,
     CONTEXT_COUNT,
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_DTYPE,
     EMBEDDING_MODEL,
+    HNSW_EF_SEARCH,
     POSTGRES_DB_PATH,
     QA_MODEL,
     TIMESTAMP_BUFFER,
@@ -66,7 +68,7 @@ class QueryAgent:
     """
 
     def __init__(self, llm: OllamaLLM) -> None:
-        start = time.time()
+        start = time.perf_counter()
         print(" -> Initializing QueryAgent...")
 
         self.llm = llm
@@ -75,11 +77,26 @@ class QueryAgent:
         print(
             " -> Connecting to vector store and initializing embedding model.."
         )
-        self.embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+        # Same half precision weights as the build, at half the memory
+        self.embeddings = HuggingFaceEmbeddings(
+            model_name=EMBEDDING_MODEL,
+            model_kwargs={"model_kwargs": {"torch_dtype": EMBEDDING_DTYPE}},
+        )
         self.vector_store = PGVector(
             connection=POSTGRES_DB_PATH,
             collection_name=COLLECTION_TABLE,
             embeddings=self.embeddings,
+            embedding_length=EMBEDDING_DIMENSIONS,
+            # Iterative scans keep filtered HNSW searches from coming up
+            # short of `k` results (requires pgvector >= 0.8)
+            engine_args={
+                "connect_args": {
+                    "options": (
+                        f"-c hnsw.ef_search={HNSW_EF_SEARCH}"
+                        " -c hnsw.iterative_scan=relaxed_order"
+                    )
+                }
+            },
         )
         self.parser = PydanticOutputParser(pydantic_object=AgentResponse)
 
@@ -98,7 +115,7 @@ class QueryAgent:
         )
         self.qa_chain = qa_prompt | self.llm | self.parser
 
-        end = time.time()
+        end = time.perf_counter()
         print(
             "\n--- KFAI Agent is ready."
             f" Setup took {format_duration(end - start)}. ---"
@@ -247,20 +264,16 @@ class QueryAgent:
         if filter_dict is None:
             filter_dict = {"$and": []}
 
-        unfiltered_docs: list[tuple[Document, float]] = []
+        # Collect every (query, filter) search first so that all of the
+        # queries are embedded together in a single model pass
+        searches: list[tuple[str, dict[str, Any]]] = []
 
         if not topics:
-            unfiltered_docs.extend(
-                self.vector_store.similarity_search_with_relevance_scores(
-                    query, k=CONTEXT_COUNT, filter=filter_dict
-                )
-            )
+            searches.append((query, filter_dict))
 
         # Get docs for each topic filter
         for topic in topics:
             print(f"  Gathering docs for topic: {topic}")
-            temp_filter = dict(deepcopy(filter_dict))
-
             # Include title in topic search
             hybrid_topic_filter = {
                 "$or": [
@@ -268,21 +281,31 @@ class QueryAgent:
                     {"text": {"$ilike": f"%{topic}%"}},
                 ]
             }
-            temp_filter["$and"].append(hybrid_topic_filter)
+            # Only the top-level list changes per topic, so the shared
+            # conditions don't need to be deep copied
+            temp_filter = {"$and": [*filter_dict["$and"], hybrid_topic_filter]}
 
             # Build relevant query
             temp_topics = topics.copy()
             temp_topics.remove(topic)
             temp_query = ", ".join(temp_topics) if temp_topics else query
 
+            searches.append((temp_query, temp_filter))
+
+        query_embeddings = self.embeddings.embed_documents(
+            [search_query for search_query, _ in searches]
+        )
+
+        unfiltered_docs: list[tuple[Document, float]] = []
+        for (_, search_filter), embedding in zip(searches, query_embeddings):
             unfiltered_docs.extend(
-                self.vector_store.similarity_search_with_relevance_scores(
-                    temp_query, k=CONTEXT_COUNT, filter=temp_filter
+                self.vector_store.similarity_search_with_score_by_vector(
+                    embedding, k=CONTEXT_COUNT, filter=search_filter
                 )
             )
 
-        # Sort docs by relevance score
-        unfiltered_docs.sort(key=lambda x: x[1], reverse=True)
+        # Sort docs by cosine distance, most relevant first
+        unfiltered_docs.sort(key=lambda x: x[1])
 
         # Deduplicate the results, limiting to CONTEXT_COUNT
         docs = []
@@ -358,7 +381,7 @@ class QueryAgent:
                   return a value.
         """
 
-        start = time.time()
+        start = time.perf_counter()
 
         docs = self._retrieve_documents(query)
 
@@ -384,7 +407,7 @@ class QueryAgent:
             print(response.query_response)
             self._print_sources(response.sources, docs)
 
-        end = time.time()
+        end = time.perf_counter()
         print(f"\n...response took {format_duration(end - start)}.")
 
         return final_response if is_gui else None
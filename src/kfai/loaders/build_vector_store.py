@@ -1,36 +1,82 @@
-import json
+from __future__ import annotations
+
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
 
+import orjson
 from langchain.schema.document import Document
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_postgres import PGVector
 
+from kfai.core.helpers import iter_json_files
 from kfai.loaders.utils.config import (
     BATCH_SIZE,
     COLLECTION_NAME,
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_DIMENSIONS,
+    EMBEDDING_DTYPE,
     EMBEDDING_MODEL,
     JSON_SOURCE_DIR,
+    LOAD_PREFETCH,
+    LOAD_WORKERS,
     POSTGRES_DB_PATH,
 )
-from kfai.loaders.utils.helpers.database import get_processed_chunk_ids
+from kfai.loaders.utils.helpers.database import (
+    create_hnsw_index,
+    get_processed_chunk_ids,
+)
 from kfai.loaders.utils.helpers.datetime import format_duration
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from concurrent.futures import Future
+    from pathlib import Path
+
+
+def _load_video_data(file_path: Path) -> dict[str, Any]:
+    """Reads and parses a single video JSON file."""
+    with file_path.open("rb") as f:
+        return dict(orjson.loads(f.read()))
+
+
+def _iter_video_data(file_paths: Iterable[Path]) -> Iterator[dict[str, Any]]:
+    """Loads video JSON files on a thread pool, yielding them in walk order.
+
+    File reads and parsing run ahead of the consumer, but no more than
+    `LOAD_PREFETCH` parsed files are held in memory at once.
+    """
+    with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+        pending: deque[Future[dict[str, Any]]] = deque()
+        for file_path in file_paths:
+            pending.append(executor.submit(_load_video_data, file_path))
+            if len(pending) >= LOAD_PREFETCH:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
 
 def run() -> None:
     # 1. Initialize Connections
     print("Initializing database connection and embedding model...")
     embeddings = HuggingFaceEmbeddings(
         model_name=EMBEDDING_MODEL,
-        model_kwargs={"device": "cuda"},
+        model_kwargs={
+            "device": "cuda",
+            "model_kwargs": {"torch_dtype": EMBEDDING_DTYPE},
+        },
         encode_kwargs={
             "normalize_embeddings": True,
-            "batch_size": 128,
+            "batch_size": EMBEDDING_BATCH_SIZE,
         },
     )
     vectorstore = PGVector(
         connection=POSTGRES_DB_PATH,
         collection_name=COLLECTION_NAME,
         embeddings=embeddings,
+        embedding_length=EMBEDDING_DIMENSIONS,
     )
     print("Initialization successful.")
 
@@ -46,12 +92,9 @@ def run() -> None:
     new_documents_batch = []
     total_added = 0
     total_skipped = 0
-    start_time = time.time()
-
-    for file_path in JSON_SOURCE_DIR.rglob("*.json"):
-        with file_path.open("r", encoding="utf-8") as f:
-            video_data = dict(json.load(f))
+    start_time = time.perf_counter()
 
+    for video_data in _iter_video_data(iter_json_files(JSON_SOURCE_DIR)):
         video_id = video_data.get("video_id")
         if not video_id:
             continue
@@ -113,7 +156,11 @@ def run() -> None:
         vectorstore.add_documents(new_documents_batch)
         total_added += len(new_documents_batch)
 
-    end_time = time.time()
+    # 7. Make sure the approximate nearest neighbor index exists
+    print("Ensuring HNSW index exists (slow on first build)...")
+    create_hnsw_index()
+
+    end_time = time.perf_counter()
     print("\n" + "=" * 50)
     print("  Data loading process complete.")
     print(f"  - Added {total_added} new documents to the collection.")
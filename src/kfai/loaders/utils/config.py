@@ -1,4 +1,4 @@
-from os import getenv
+from os import cpu_count, getenv
 
 from dotenv import load_dotenv
 
@@ -12,11 +12,19 @@ load_dotenv()
 POSTGRES_DB_PATH = getenv("POSTGRES_DB_PATH", default="")
 COLLECTION_NAME = "video_transcript_chunks"
 BATCH_SIZE = 256
+EMBEDDING_BATCH_SIZE = BATCH_SIZE  # One encoder pass per inserted batch
 COLLECTION_TABLE = "video_transcript_chunks"
 CONTEXT_COUNT = 120
 TIMESTAMP_BUFFER = 10
+LOAD_WORKERS = min(32, (cpu_count() or 1) * 4)
+LOAD_PREFETCH = LOAD_WORKERS * 2
 
 EMBEDDING_MODEL = "mixedbread-ai/mxbai-embed-large-v1"
+EMBEDDING_DTYPE = "float16"  # Half precision weights for the CUDA build
+EMBEDDING_DIMENSIONS = 1024  # Output size of EMBEDDING_MODEL
+HNSW_M = 16
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 2 * CONTEXT_COUNT  # Must be >= k for full result sets
 PARSING_MODEL = "qwen3:14b-q4_K_M"
 QA_MODEL = "qwen3:14b-q4_K_M"
 
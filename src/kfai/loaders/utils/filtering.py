@@ -14,6 +14,9 @@ if TYPE_CHECKING:
         PGVectorShowName,
     )
 
+# -- GLOBAL REGEX COMPILERS ---
+_escape_like_wildcards = re.compile(r"([%_])").sub
+
 
 def build_filter(
     parsed_response: QueryParseResponse,
@@ -110,7 +113,7 @@ def build_filter(
         filter_conditions.append(show_filter)
 
     for host in hosts_list:
-        host = re.sub(r"([%_])", r"\\\1", host)
+        host = _escape_like_wildcards(r"\\\1", host)
         host_filter: PGVectorHosts = {"hosts": {"$like": f"%{host}%"}}
         filter_conditions.append(host_filter)
 
@@ -4,7 +4,13 @@ from typing import TYPE_CHECKING
 
 from sqlalchemy import create_engine, text
 
-from kfai.loaders.utils.config import COLLECTION_NAME, POSTGRES_DB_PATH
+from kfai.loaders.utils.config import (
+    COLLECTION_NAME,
+    EMBEDDING_DIMENSIONS,
+    HNSW_EF_CONSTRUCTION,
+    HNSW_M,
+    POSTGRES_DB_PATH,
+)
 
 if TYPE_CHECKING:
     from sqlalchemy import Engine
@@ -50,6 +56,49 @@ def get_processed_chunk_ids() -> set[tuple[str, float]]:
     return processed_ids
 
 
+def create_hnsw_index() -> None:
+    """
+    Creates the HNSW index on the embedding column if it doesn't exist.
+
+    pgvector can only index columns with a fixed dimension, so a column
+    created without one (older collections) is converted first.
+    """
+    try:
+        with create_engine(POSTGRES_DB_PATH).begin() as connection:
+            typmod = connection.execute(
+                text(
+                    """
+                    SELECT atttypmod FROM pg_attribute
+                    WHERE attrelid = 'langchain_pg_embedding'::regclass
+                    AND attname = 'embedding'
+                    """
+                )
+            ).scalar()
+            if typmod == -1:
+                connection.execute(
+                    text(
+                        f"""
+                        ALTER TABLE langchain_pg_embedding
+                        ALTER COLUMN embedding TYPE vector({EMBEDDING_DIMENSIONS})
+                        """  # noqa: E501
+                    )
+                )
+            connection.execute(
+                text(
+                    f"""
+                    CREATE INDEX IF NOT EXISTS ix_langchain_pg_embedding_hnsw
+                    ON langchain_pg_embedding
+                    USING hnsw (embedding vector_cosine_ops)
+                    WITH (m = {HNSW_M}, ef_construction = {HNSW_EF_CONSTRUCTION})
+                    """  # noqa: E501
+                )
+            )
+    except Exception as e:
+        print(
+            f"Could not create HNSW index, searches will be exact. Error: {e}"
+        )
+
+
 def get_unique_metadata(engine: Engine) -> tuple[list[str], list[str]]:
     """Queries the database to get all unique show names and hosts."""
     show_names = set()
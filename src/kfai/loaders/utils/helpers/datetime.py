@@ -29,11 +29,11 @@ def format_duration(seconds: float) -> str:
     seconds = seconds % 60  # Remaining seconds - keep as float
 
     # Build the formatted string
-    duration_str = ""
+    parts = []
     if hours > 0:
-        duration_str += f"{hours} hour{'s' if hours > 1 else ''}, "
+        parts.append(f"{hours} hour{'s' if hours > 1 else ''}")
     if minutes > 0:
-        duration_str += f"{minutes} minute{'s' if minutes > 1 else ''}, "
-    duration_str += f"{seconds:.2f} seconds"
+        parts.append(f"{minutes} minute{'s' if minutes > 1 else ''}")
+    parts.append(f"{seconds:.2f} seconds")
 
-    return duration_str
+    return ", ".join(parts)
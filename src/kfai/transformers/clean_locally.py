@@ -1,30 +1,111 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from traceback import format_exc
+from typing import TYPE_CHECKING
 
-from langchain_ollama import OllamaLLM
+from ollama import Client
+from tqdm import tqdm
 
+from kfai.core.helpers import iter_json_files
 from kfai.core.paths import CLEANED_JSON_DIR, LOGS_DIR, RAW_JSON_DIR
 from kfai.transformers.utils.cleaning import clean_transcript
-from kfai.transformers.utils.config import CLEANING_MODEL
+from kfai.transformers.utils.config import CLEANING_WORKERS, MANIFEST_FILE
 from kfai.transformers.utils.helpers import (
     check_data_integrity,
+    file_sha256,
+    load_manifest,
     load_raw_data,
     save_cleaned_data,
+    save_manifest,
 )
 from kfai.transformers.utils.logger_config import setup_logging
 
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from kfai.core.types import ManifestEntry
+
 logger = setup_logging()
 
 
-def run() -> None:
-    llm = OllamaLLM(
-        model=CLEANING_MODEL,
-        temperature=0.1,
-        top_p=0.92,
-        top_k=40,
-        keep_alive=60,
-        reasoning=False,
-        verbose=False,
+def _process_file(
+    file_path: Path,
+    client: Client,
+    manifest: dict[str, ManifestEntry],
+    cleaned_keys: set[str],
+) -> None:
+    """Cleans a single raw video file and saves the result.
+
+    `manifest` maps each cleaned video's relative path to the SHA-256,
+    size and mtime of the raw file it was cleaned from, and is updated
+    after each save. `cleaned_keys` holds the relative paths of existing
+    cleaned files.
+    """
+    relative_path = file_path.relative_to(RAW_JSON_DIR)
+    cleaned_path = CLEANED_JSON_DIR / relative_path
+    manifest_key = relative_path.as_posix()
+    is_cleaned = manifest_key in cleaned_keys
+    stat = file_path.stat()
+    entry = manifest.get(manifest_key)
+
+    # An unchanged size and mtime mean an unchanged file, so cleaned videos
+    # are skipped without reading and hashing their raw file
+    if (
+        is_cleaned
+        and entry is not None
+        and entry["size"] == stat.st_size
+        and entry["mtime_ns"] == stat.st_mtime_ns
+    ):
+        return
+
+    current: ManifestEntry = {
+        "sha256": file_sha256(file_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+    # Otherwise compare digests. Cleaned files that predate the manifest
+    # are adopted as up to date, and touched but identical files get their
+    # stat refreshed so they aren't hashed again.
+    if is_cleaned:
+        if entry is None or entry["sha256"] == current["sha256"]:
+            manifest[manifest_key] = current
+            return
+        tqdm.write(f"\n--- {relative_path} changed since it was cleaned ---")
+
+    tqdm.write("\n" + "=" * 50)
+    tqdm.write(f"--- Processing {relative_path} ---")
+
+    # Load video metadata and transcripts into dict
+    video_data = load_raw_data(file_path)
+
+    # Skip videos that don't have a transcript
+    if not video_data or not video_data.get("transcript_chunks"):
+        logger.warning(f"{file_path} does not have a transcript.")
+        return
+
+    # Clean the transcript
+    cleaned_video_data = clean_transcript(video_data, relative_path, client)
+
+    if cleaned_video_data is None:
+        return
+
+    # Verify integrity of the cleaned data
+    data_is_valid = check_data_integrity(
+        video_data, cleaned_video_data, relative_path
     )
+    if not data_is_valid:
+        return
+
+    # Save cleaned data to JSON file
+    if save_cleaned_data(cleaned_path, cleaned_video_data):
+        manifest[manifest_key] = current
+
+
+def run() -> None:
+    # One client shares its connection pool across the cleaning workers
+    client = Client()
 
     CLEANED_JSON_DIR.mkdir(parents=True, exist_ok=True)
     print(
@@ -32,52 +113,33 @@ def run() -> None:
         f" Cleaned destination: '{CLEANED_JSON_DIR}'"
     )
 
-    # Reduce import calls
-    _load_raw_data = load_raw_data
-    _clean_transcript = clean_transcript
-    _check_data_integrity = check_data_integrity
-    _save_cleaned_data = save_cleaned_data
+    manifest = load_manifest(MANIFEST_FILE)
 
     try:
-        for file_path in RAW_JSON_DIR.rglob("*.json"):
-            relative_path = file_path.relative_to(RAW_JSON_DIR)
-            cleaned_path = CLEANED_JSON_DIR / relative_path
-
-            # Skip videos that have already been cleaned
-            if cleaned_path.exists():
-                continue
-
-            print("\n" + "=" * 50)
-            print(f"--- Processing {relative_path} ---")
-
-            # Load video metadata and transcripts into dict
-            video_data = _load_raw_data(file_path)
-
-            # Skip videos that don't have a transcript
-            if not video_data or not video_data.get("transcript_chunks"):
-                logger.warning(f"{file_path} does not have a transcript.")
-                continue
-
-            # Clean the transcript
-            cleaned_video_data = _clean_transcript(
-                video_data, relative_path, llm
-            )
-
-            if cleaned_video_data is None:
-                continue
-
-            # Verify integrity of the cleaned data
-            data_is_valid = _check_data_integrity(
-                video_data, cleaned_video_data, relative_path
-            )
-            if not data_is_valid:
-                continue
-
-            # Save cleaned data to JSON file
-            _save_cleaned_data(cleaned_path, cleaned_video_data)
-
-        else:
-            print("\nCleaning process complete.")
+        # One scan of the cleaned tree instead of a stat per raw file
+        cleaned_keys = {
+            file_path.relative_to(CLEANED_JSON_DIR).as_posix()
+            for file_path in iter_json_files(CLEANED_JSON_DIR)
+        }
+
+        # Videos are cleaned concurrently so Ollama can serve several
+        # requests at once instead of idling between sequential calls
+        with ThreadPoolExecutor(max_workers=CLEANING_WORKERS) as executor:
+            futures = [
+                executor.submit(
+                    _process_file, file_path, client, manifest, cleaned_keys
+                )
+                for file_path in iter_json_files(RAW_JSON_DIR)
+            ]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except BaseException:
+                # Don't start any queued videos after a failure
+                executor.shutdown(cancel_futures=True)
+                raise
+
+        print("\nCleaning process complete.")
 
     except:
         logger.critical(
@@ -86,3 +148,6 @@ def run() -> None:
         logger.critical(format_exc())
         print(f"\n!! A critical error occurred. See {LOGS_DIR} for details.")
         raise
+
+    finally:
+        save_manifest(MANIFEST_FILE, manifest)
@@ -1,20 +1,40 @@
 from __future__ import annotations
 
-import json
+from time import sleep
 from traceback import format_exc
 from typing import TYPE_CHECKING
 
+import orjson
 from tqdm import tqdm
 
 from kfai.core.paths import LOGS_DIR
-from kfai.transformers.utils.helpers import clean_response, clean_text_chunk
+from kfai.transformers.utils.config import (
+    CHUNK_ATTEMPTS,
+    CHUNK_CACHE_FILE,
+    CHUNK_RETRY_DELAY,
+    CLEANING_KEEP_ALIVE,
+    CLEANING_MODEL,
+    CLEANING_OPTIONS,
+)
+from kfai.transformers.utils.helpers import (
+    chunk_cache_key,
+    clean_response,
+    clean_text_chunk,
+    load_cached_chunks,
+    needs_cleaning,
+    save_cached_chunks,
+)
 from kfai.transformers.utils.logger_config import setup_logging
-from kfai.transformers.utils.prompts import SYSTEM_PROMPT, USER_PROMPT
+from kfai.transformers.utils.prompts import (
+    SYSTEM_PROMPT,
+    USER_PROMPT_PREFIX,
+    USER_PROMPT_SUFFIX,
+)
 
 if TYPE_CHECKING:
     from pathlib import Path
 
-    from langchain_ollama import OllamaLLM
+    from ollama import Client
 
     from kfai.core.types import CompleteVideoRecord, TranscriptChunk
 
@@ -22,7 +42,7 @@ logger = setup_logging()
 
 
 def clean_transcript(
-    video_data: CompleteVideoRecord, relative_path: Path, llm: OllamaLLM
+    video_data: CompleteVideoRecord, relative_path: Path, client: Client
 ) -> CompleteVideoRecord | None:
     """Cleans a video's transcript with Ollama, one chunk at a time."""
     try:
@@ -31,72 +51,121 @@ def clean_transcript(
             "transcript_chunks"
         ]
         chunk_count = len(transcript_chunks)
+        # Shallow copy: only the transcript list is replaced
         cleaned_video_data: CompleteVideoRecord = {
-            "id": video_data["id"],
-            "video_id": video_data["video_id"],
-            "show_name": video_data["show_name"],
-            "hosts": video_data["hosts"],
-            "title": video_data["title"],
-            "description": video_data["description"],
-            "published_at": video_data["published_at"],
-            "duration": video_data["duration"],
+            **video_data,
             "transcript_chunks": [],
         }
         assert cleaned_video_data["transcript_chunks"] is not None
-        metadata = (
-            json.dumps(cleaned_video_data)
-            .replace("{", "{{")
-            .replace("}", "}}")
-        )  # Escape brackets for `user_prompt_template.format(chunk=text)`
-
-        _invoke_llm = llm.invoke
+        # Only the fields the prompt tells the model to use, as compact
+        # UTF-8 JSON, to keep the metadata tokens in every prompt low
+        metadata = orjson.dumps(
+            {
+                "show_name": video_data["show_name"],
+                "hosts": video_data["hosts"],
+                "title": video_data["title"],
+                "description": video_data["description"],
+            }
+        ).decode()
+
+        _chat = client.chat
         _clean = clean_response
 
+        # Concurrent workers each get their own labelled bar
         progress_bar = tqdm(
             total=chunk_count,
+            desc=str(relative_path),
             unit="chunk",
         )
 
-        user_prompt_template = USER_PROMPT.format(
-            metadata=metadata, chunk="{chunk}"
-        )
+        # Metadata is rendered once, each chunk is concatenated onto it
+        user_prompt_prefix = USER_PROMPT_PREFIX.format(metadata=metadata)
 
-        for chunk in transcript_chunks:
-            text = clean_text_chunk(chunk["text"])
-            user_prompt = user_prompt_template.format(chunk=text)
-
-            try:
-                response = _invoke_llm(
-                    [
-                        {
-                            "role": "system",
-                            "content": SYSTEM_PROMPT,
-                        },
-                        {"role": "user", "content": user_prompt},
-                    ]
+        # Chunks cleaned on an earlier run, or repeated within this video,
+        # are served from the cache instead of the LLM
+        texts = [
+            clean_text_chunk(chunk["text"]) for chunk in transcript_chunks
+        ]
+        keys = [chunk_cache_key(user_prompt_prefix, text) for text in texts]
+        cached = load_cached_chunks(CHUNK_CACHE_FILE, keys)
+        new_entries: dict[str, str] = {}
+
+        for chunk, text, key in zip(transcript_chunks, texts, keys):
+            # Keep chunks as-is when there is nothing for the LLM to fix
+            if not needs_cleaning(text):
+                cleaned_video_data["transcript_chunks"].append(
+                    {"text": text, "start": chunk["start"]}
                 )
-
-                response = _clean(response)
-                cleaned_chunk: TranscriptChunk = {
-                    "text": response.strip(),
-                    "start": chunk["start"],
-                }
-                cleaned_video_data["transcript_chunks"].append(cleaned_chunk)
                 progress_bar.update(1)
-            except Exception:
-                logger.error(
-                    f"LLM call failed on chunk in {relative_path} starting "
-                    f"at {chunk['start']}s."
-                )
-                logger.error(format_exc())
-                print(
-                    f"  !! LLM call failed. See {LOGS_DIR} for details."
-                    " Skipping video."
+                continue
+
+            if key in cached:
+                cleaned_video_data["transcript_chunks"].append(
+                    {"text": cached[key], "start": chunk["start"]}
                 )
-                progress_bar.close()
-                return None
+                progress_bar.update(1)
+                continue
+
+            user_prompt = user_prompt_prefix + text + USER_PROMPT_SUFFIX
+
+            messages = [
+                {
+                    "role": "system",
+                    "content": SYSTEM_PROMPT,
+                },
+                {"role": "user", "content": user_prompt},
+            ]
+
+            # Retry a failed chunk before dropping the whole video so a
+            # transient error doesn't discard the chunks already cleaned
+            for attempt in range(1, CHUNK_ATTEMPTS + 1):
+                try:
+                    response = _chat(
+                        model=CLEANING_MODEL,
+                        messages=messages,
+                        options=CLEANING_OPTIONS,
+                        keep_alive=CLEANING_KEEP_ALIVE,
+                        think=False,
+                    )
+                    break
+                except Exception:
+                    if attempt < CHUNK_ATTEMPTS:
+                        logger.warning(
+                            f"LLM call failed on chunk in {relative_path}"
+                            f" starting at {chunk['start']}s. Retrying"
+                            f" ({attempt}/{CHUNK_ATTEMPTS})."
+                        )
+                        # Back off exponentially to let the server recover
+                        sleep(CHUNK_RETRY_DELAY * 2 ** (attempt - 1))
+                        continue
+
+                    logger.error(
+                        f"LLM call failed on chunk in {relative_path} "
+                        f"starting at {chunk['start']}s."
+                    )
+                    logger.error(format_exc())
+                    tqdm.write(
+                        f"  !! LLM call failed. See {LOGS_DIR} for details."
+                        " Skipping video."
+                    )
+                    save_cached_chunks(CHUNK_CACHE_FILE, new_entries)
+                    progress_bar.close()
+                    return None
+
+            cleaned_text = _clean(response.message.content or "")
+            # An empty response fails the integrity check, so it isn't
+            # cached and the chunk is sent to the LLM again next run
+            if cleaned_text:
+                cached[key] = new_entries[key] = cleaned_text
+            cleaned_chunk: TranscriptChunk = {
+                "text": cleaned_text,
+                "start": chunk["start"],
+            }
+            cleaned_video_data["transcript_chunks"].append(cleaned_chunk)
+            progress_bar.update(1)
 
         progress_bar.close()
+        save_cached_chunks(CHUNK_CACHE_FILE, new_entries)
 
         return cleaned_video_data
     except Exception:
@@ -105,7 +174,7 @@ def clean_transcript(
             f" for {relative_path}."
         )
         logger.error(format_exc())
-        print(
+        tqdm.write(
             f"  !! An unexpected error occurred. See {LOGS_DIR} for"
             " details. Skipping video."
         )
@@ -1,4 +1,21 @@
-from kfai.core.paths import LOGS_DIR
+from os import getenv
 
-CLEANING_MODEL = "llama3.1:8b-instruct-q8_0"
+from dotenv import load_dotenv
+
+from kfai.core.paths import DATA_DIR, LOGS_DIR
+
+load_dotenv()
+
+CLEANING_MODEL = getenv(
+    "CLEANING_MODEL", default="llama3.1:8b-instruct-q4_K_M"
+)
+CLEANING_OPTIONS = {"temperature": 0.1, "top_p": 0.92, "top_k": 40}
+CLEANING_KEEP_ALIVE = 60  # Seconds the model stays loaded after a request
+# Videos cleaned concurrently, matched to the Ollama server's request slots
+CLEANING_WORKERS = max(1, int(getenv("OLLAMA_NUM_PARALLEL") or 4))
+CHUNK_ATTEMPTS = 3  # LLM calls per chunk before the video is skipped
+CHUNK_RETRY_DELAY = 2.0  # Seconds before the first retry, doubled after
 LOG_FILE = LOGS_DIR / "cleaning_process.log"
+MANIFEST_FILE = DATA_DIR / "cleaning_manifest.json"  # Raw file digests/stats
+CHUNK_CACHE_FILE = DATA_DIR / "chunk_cache.sqlite"  # Cleaned text by chunk
+CHUNK_CACHE_MAX_VARIABLES = 900  # Keys per lookup, under SQLite's 999 limit
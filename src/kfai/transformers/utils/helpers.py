@@ -1,35 +1,90 @@
 from __future__ import annotations
 
-import json
+import hashlib
 import logging
 import re
+import sqlite3
+from contextlib import closing
 from traceback import format_exc
 from typing import TYPE_CHECKING
 
+import orjson
+from tqdm import tqdm
+
+from kfai.core.helpers import clean_llm_response
+from kfai.transformers.utils.config import (
+    CHUNK_CACHE_MAX_VARIABLES,
+    CLEANING_MODEL,
+    CLEANING_OPTIONS,
+)
+from kfai.transformers.utils.prompts import SYSTEM_PROMPT, USER_PROMPT_SUFFIX
+
 if TYPE_CHECKING:
     from pathlib import Path
 
-    from kfai.core.types import CompleteVideoRecord, TranscriptChunk
+    from kfai.core.types import (
+        CompleteVideoRecord,
+        ManifestEntry,
+        TranscriptChunk,
+    )
 
 logger = logging.getLogger()
 
 # -- GLOBAL REGEX COMPILERS ---
 _compile = re.compile
-_sub_profanity = _compile(r"\[\u00a0__\u00a0\]").sub
-_sub_bracket_tags = _compile(r"\[\s*[^]]*?\s*\]").sub
+# Profanity references (group 1), ">>" and bracket tags. The tag pattern
+# has no overlapping quantifiers, so an unclosed "[" can't backtrack.
+_sub_transcript_noise = _compile(r"(\[\u00a0__\u00a0\])|>>|\[[^]]*\]").sub
 _sub_whitespace = _compile(r"\s+").sub
 _sub_chunk = _compile(r"</?CHUNK>").sub
-_sub_squotes = _compile(r"[‘’]").sub
-_sub_dquotes = _compile(r"[“”]").sub
+# Everything up to and including the last preamble the model adds. The
+# \A anchor stops a marker-free response being rescanned from every offset.
+_sub_preamble = _compile(
+    r"\A.*Here(?:'s| is) the cleaned chunk:", re.DOTALL
+).sub
+_search_letter = _compile(r"[^\W\d_]").search
+_find_words = _compile(r"[\w'-]+").findall
+
+# Interjections the LLM has nothing to correct in
+_FILLER_WORDS = frozenset(
+    {
+        "ah",
+        "hmm",
+        "huh",
+        "mm",
+        "mm-hmm",
+        "no",
+        "nope",
+        "oh",
+        "ok",
+        "okay",
+        "right",
+        "uh",
+        "uh-huh",
+        "um",
+        "wow",
+        "yeah",
+        "yep",
+        "yes",
+    }
+)
+
+# Single-character fixes: zero-width spaces and curly quotes
+_transcript_chars = str.maketrans(
+    {"\u200b": None, "‘": "'", "’": "'", "“": '"', "”": '"'}
+)
+
+# Cleaned output directories already created during this run
+_created_dirs: set[Path] = set()
 
 
 def load_raw_data(file_path: Path) -> CompleteVideoRecord | None:
     """Loads and returns the JSON data from a given file path."""
     try:
-        with file_path.open("r", encoding="utf-8") as f:
-            video_data: CompleteVideoRecord = json.load(f)
+        with file_path.open("rb") as f:
+            video_data: CompleteVideoRecord = orjson.loads(f.read())
             return video_data
-    except (OSError, json.JSONDecodeError):
+    except (OSError, orjson.JSONDecodeError):
         logger.error(f"Failed to load or parse source file: {file_path}")
         logger.error(format_exc())
         return None
@@ -41,10 +96,9 @@ def check_data_integrity(
     relative_path: Path,
 ) -> bool:
     """Performs data integrity checks and returns True if all pass."""
-    if not cleaned_data or set(cleaned_data.keys()) != set(raw_data.keys()):
+    if not cleaned_data:
         logger.warning(
-            f"Data integrity check failed for {relative_path}: Key mismatch"
-            " or empty data."
+            f"Data integrity check failed for {relative_path}: Empty data."
         )
         return False
 
@@ -67,6 +121,21 @@ def check_data_integrity(
         logger.error(f"In {relative_path}: {error_msg}")
         return False
 
+    # Each chunk must keep its place, and a chunk the LLM was asked to clean
+    # must not come back empty, which would silently drop transcript text
+    for raw_chunk, cleaned_chunk in zip(
+        raw_transcript_chunks, cleaned_transcript_chunks
+    ):
+        if raw_chunk["start"] != cleaned_chunk["start"] or (
+            not cleaned_chunk["text"]
+            and needs_cleaning(clean_text_chunk(raw_chunk["text"]))
+        ):
+            logger.error(
+                f"In {relative_path}: Data integrity error: chunk at"
+                f" {raw_chunk['start']}s is out of place or came back empty."
+            )
+            return False
+
     return True
 
 
@@ -78,10 +147,14 @@ def save_cleaned_data(
     """
     try:
         cleaned_dir = cleaned_path.parent
-        cleaned_dir.mkdir(parents=True, exist_ok=True)
-        with cleaned_path.open("w", encoding="utf-8") as f:
-            json.dump(cleaned_video_data, f, indent=4)
-        print(f"  -> Successfully cleaned and saved to {cleaned_path}")
+        if cleaned_dir not in _created_dirs:
+            cleaned_dir.mkdir(parents=True, exist_ok=True)
+            _created_dirs.add(cleaned_dir)
+        with cleaned_path.open("wb") as f:
+            f.write(
+                orjson.dumps(cleaned_video_data, option=orjson.OPT_INDENT_2)
+            )
+        tqdm.write(f"  -> Successfully cleaned and saved to {cleaned_path}")
         return True
     except Exception:
         logger.error(f"Failed to save cleaned file: {cleaned_path}")
@@ -89,27 +162,152 @@ def save_cleaned_data(
         return False
 
 
+def file_sha256(file_path: Path) -> str:
+    """Returns the SHA-256 hex digest of a file's contents."""
+    with file_path.open("rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def load_manifest(manifest_path: Path) -> dict[str, ManifestEntry]:
+    """Loads the manifest of raw file digests for already cleaned videos."""
+    try:
+        with manifest_path.open("rb") as f:
+            manifest: dict[str, ManifestEntry] = orjson.loads(f.read())
+        # Older manifests hold only the digest. A stat of -1 never matches,
+        # so those files are hashed once and their entries upgraded.
+        for key, entry in manifest.items():
+            if isinstance(entry, str):
+                manifest[key] = {"sha256": entry, "size": -1, "mtime_ns": -1}
+        return manifest
+    except FileNotFoundError:
+        return {}
+    except (OSError, orjson.JSONDecodeError):
+        logger.warning(
+            f"Failed to load or parse {manifest_path}, starting a new one."
+        )
+        return {}
+
+
+def save_manifest(
+    manifest_path: Path, manifest: dict[str, ManifestEntry]
+) -> None:
+    """Saves the manifest of raw file digests to a JSON file."""
+    try:
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        with manifest_path.open("wb") as f:
+            f.write(
+                orjson.dumps(
+                    manifest,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS,
+                )
+            )
+    except OSError:
+        logger.error(f"Failed to save manifest: {manifest_path}")
+        logger.error(format_exc())
+
+
+def chunk_cache_key(user_prompt_prefix: str, text: str) -> str:
+    """Returns the chunk cache key for a preprocessed chunk's text.
+
+    The key covers everything the model receives: the model, the system
+    prompt, the user prompt prefix rendered with the video's metadata, the
+    suffix and the sampling options. A response is only reused for the
+    same video context and settings it was produced under.
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    for part in (
+        CLEANING_MODEL,
+        SYSTEM_PROMPT,
+        user_prompt_prefix,
+        USER_PROMPT_SUFFIX,
+        orjson.dumps(CLEANING_OPTIONS, option=orjson.OPT_SORT_KEYS).decode(),
+        text,
+    ):
+        # Length-prefixed so adjacent parts can't run into each other
+        hasher.update(f"{len(part)}:{part}".encode())
+    return hasher.hexdigest()
+
+
+def _connect_chunk_cache(cache_path: Path) -> sqlite3.Connection:
+    """Opens the chunk cache database, creating it if needed."""
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(cache_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS chunk_cache"
+        " (key TEXT PRIMARY KEY, text TEXT NOT NULL)"
+    )
+    return conn
+
+
+def load_cached_chunks(cache_path: Path, keys: list[str]) -> dict[str, str]:
+    """Returns the cached cleaned text for each of the keys found."""
+    try:
+        with closing(_connect_chunk_cache(cache_path)) as conn:
+            cached: dict[str, str] = {}
+            unique_keys = list(dict.fromkeys(keys))
+            # Older SQLite builds cap bound parameters at 999 per statement
+            for i in range(0, len(unique_keys), CHUNK_CACHE_MAX_VARIABLES):
+                batch_keys = unique_keys[i : i + CHUNK_CACHE_MAX_VARIABLES]
+                placeholders = ",".join("?" for _ in batch_keys)
+                cached.update(
+                    conn.execute(
+                        "SELECT key, text FROM chunk_cache"
+                        f" WHERE key IN ({placeholders})",
+                        batch_keys,
+                    ).fetchall()
+                )
+            return cached
+    except (OSError, sqlite3.Error):
+        logger.warning(f"Failed to read chunk cache: {cache_path}")
+        logger.warning(format_exc())
+        return {}
+
+
+def save_cached_chunks(cache_path: Path, entries: dict[str, str]) -> None:
+    """Adds newly cleaned chunks to the cache in a single transaction."""
+    if not entries:
+        return
+
+    try:
+        with closing(_connect_chunk_cache(cache_path)) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO chunk_cache VALUES (?, ?)",
+                entries.items(),
+            )
+    except (OSError, sqlite3.Error):
+        logger.error(f"Failed to save chunk cache: {cache_path}")
+        logger.error(format_exc())
+
+
+def _replace_noise(match: re.Match[str]) -> str:
+    return "****" if match.lastindex else ""
+
+
 def clean_text_chunk(text: str) -> str:
-    # Fix transcript profanity reference
-    text = _sub_profanity("****", text)
+    # Drop zero-width spaces and straighten quotes
+    text = text.translate(_transcript_chars)
 
-    # Remove filler
-    text = text.replace("\u200b", "").replace("\xa0", " ")
-    text = text.replace(">>", "")
+    # Fix profanity references and remove filler in a single pass
+    text = _sub_transcript_noise(_replace_noise, text)
 
-    # Regex cleanup
-    text = _sub_bracket_tags("", text)
+    # Collapse whitespace, including non-breaking spaces
     text = _sub_whitespace(" ", text).strip()
 
     return text
 
 
+def needs_cleaning(text: str) -> bool:
+    """Returns False for chunks the LLM has nothing to correct in."""
+    # No letters means no words to fix (e.g. "****", "2, 3", or empty)
+    if _search_letter(text) is None:
+        return False
+
+    # Nothing but interjections (e.g. "Yeah, right. Mm-hmm.")
+    return not _FILLER_WORDS.issuperset(_find_words(text.lower()))
+
+
 def clean_response(response: str) -> str:
     """Clean common LLM inconsistencies in the response."""
-    response = response.split("Here is the cleaned chunk:")[-1]
-    response = response.split("Here's the cleaned chunk:")[-1]
-    response = response.split("</think>")[-1]
+    response = _sub_preamble("", response, count=1)
     response = _sub_chunk("", response)
-    response = _sub_squotes("'", response)
-    response = _sub_dquotes('"', response)
-    return response
+    return clean_llm_response(response)
@@ -22,13 +22,14 @@ EXAMPLES OF POSSIBLE CHANGES (INPUT → CLEANED):
   - "game over greggy" → "GameOverGreggy"
 """  # noqa: E501
 
-# Used with new data each LLM call
-USER_PROMPT = """
+# Used with new data each LLM call: PREFIX + chunk + SUFFIX
+USER_PROMPT_PREFIX = """
 METADATA CONTEXT:
 {metadata}
 
 RAW CHUNK:
-{chunk}
+"""
+USER_PROMPT_SUFFIX = """
 
 RESPONSE:
 """
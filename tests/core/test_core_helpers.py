@@ -1,6 +1,29 @@
 import pytest
 
-from kfai.loaders.utils.helpers import llm as llm_utils
+from kfai.core.helpers import clean_llm_response, iter_json_files
+
+
+def test_iter_json_files_walks_nested_directories(tmp_path):
+    """Tests that JSON files are found at every depth, and nothing else."""
+    # Arrange
+    (tmp_path / "2024" / "01").mkdir(parents=True)
+    (tmp_path / "top.json").write_text("{}")
+    (tmp_path / "2024" / "01" / "vid1.json").write_text("{}")
+    (tmp_path / "2024" / "01" / "notes.txt").write_text("")
+
+    # Act
+    found = iter_json_files(tmp_path)
+
+    # Assert
+    assert sorted(p.relative_to(tmp_path).as_posix() for p in found) == [
+        "2024/01/vid1.json",
+        "top.json",
+    ]
+
+
+def test_iter_json_files_missing_root(tmp_path):
+    """Tests that a directory that doesn't exist yields nothing."""
+    assert list(iter_json_files(tmp_path / "missing")) == []
 
 
 # Use parametrize to efficiently test multiple scenarios with one function
@@ -43,4 +66,4 @@ def test_clean_llm_response(input_string, expected_output):
     ensure it correctly removes thought tags, normalizes quotes, and
     strips whitespace.
     """
-    assert llm_utils.clean_llm_response(input_string) == expected_output
+    assert clean_llm_response(input_string) == expected_output
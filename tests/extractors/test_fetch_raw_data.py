@@ -1,6 +1,7 @@
-import json
+import time
 from unittest.mock import MagicMock
 
+import orjson
 import pytest
 
 from kfai.extractors import fetch_raw_data
@@ -36,8 +37,12 @@ def mock_dependencies(mocker):
         "process_video": mocker.patch(
             "kfai.extractors.fetch_raw_data.process_video"
         ),
+        "iter_json_files": mocker.patch(
+            "kfai.extractors.fetch_raw_data.iter_json_files"
+        ),
         "sleep": mocker.patch("kfai.extractors.fetch_raw_data.sleep"),
         "print": mocker.patch("builtins.print"),
+        "write": mocker.patch("kfai.extractors.fetch_raw_data.tqdm.write"),
         "skip_file_path": mock_skip_file,
         "sqlite_path": mock_sqlite_path,
         "raw_json_dir": mock_raw_json_dir,
@@ -58,9 +63,7 @@ def test_run_happy_path(mocker, mock_dependencies):
     mock_dependencies["sqlite_path"].exists.return_value = True
     mock_processed_file = MagicMock()
     mock_processed_file.stem = "vid2"
-    mock_dependencies["raw_json_dir"].rglob.return_value = [
-        mock_processed_file
-    ]
+    mock_dependencies["iter_json_files"].return_value = [mock_processed_file]
 
     mock_file_open = mocker.mock_open(read_data='["vid1"]')
     mocker.patch.object(
@@ -91,9 +94,9 @@ def test_run_happy_path(mocker, mock_dependencies):
     # Get the mock file handle
     handle = mock_file_open()
     # Join all the calls to write() into a single string
-    written_content = "".join(c.args[0] for c in handle.write.call_args_list)
+    written_content = b"".join(c.args[0] for c in handle.write.call_args_list)
     # Assert that the complete written content matches the expected JSON
-    assert sorted(json.loads(written_content)) == ["vid1", "vid3"]
+    assert sorted(orjson.loads(written_content)) == ["vid1", "vid3"]
 
 
 # Add this new test to cover the final missing line
@@ -106,7 +109,7 @@ def test_run_skips_video_in_final_loop(mock_dependencies):
     mock_dependencies["skip_file_path"].exists.return_value = True
     mock_dependencies["sqlite_path"].exists.return_value = True
     # No previously processed JSON files
-    mock_dependencies["raw_json_dir"].rglob.return_value = []
+    mock_dependencies["iter_json_files"].return_value = []
 
     # Mock the skip file to contain 'vid1'
     mock_file_open = mock_dependencies["skip_file_path"].open
@@ -139,7 +142,7 @@ def test_run_no_new_videos(mock_dependencies):
     mock_dependencies["skip_file_path"].exists.return_value = False
     mock_dependencies["sqlite_path"].exists.return_value = True
     mock_dependencies["get_db_data"].return_value = [{"video_id": "vid1"}]
-    mock_dependencies["raw_json_dir"].rglob.return_value = [
+    mock_dependencies["iter_json_files"].return_value = [
         MagicMock(stem="vid1")
     ]
 
@@ -164,7 +167,7 @@ def test_run_creates_sqlite_db_if_not_exists(mock_dependencies):
 
 
 @pytest.mark.parametrize(
-    "error", [json.JSONDecodeError("msg", "doc", 0), OSError("msg")]
+    "error", [orjson.JSONDecodeError("msg", "doc", 0), OSError("msg")]
 )
 def test_run_handles_corrupt_skip_file(mocker, mock_dependencies, error):
     mock_dependencies["skip_file_path"].exists.return_value = True
@@ -199,7 +202,7 @@ def test_run_handles_missing_youtube_data(mock_dependencies):
     fetch_raw_data.run()
 
     mock_dependencies["process_video"].assert_not_called()
-    mock_dependencies["print"].assert_any_call(
+    mock_dependencies["write"].assert_any_call(
         "Warning: Could not find YouTube API data for new video ID: vid1"
     )
 
@@ -227,3 +230,120 @@ def test_run_handles_failed_skip_file_write(mocker, mock_dependencies):
         "FATAL: Could not write to log file"
         f" {mock_dependencies['skip_file_path']}. Error: Disk full"
     )
+
+
+def test_run_writes_skip_file_once(mocker, mock_dependencies):
+    """
+    Tests that the skip file is written a single time after the loop,
+    covering every video that failed during the run.
+    """
+    mock_dependencies["skip_file_path"].exists.return_value = False
+    mock_dependencies["sqlite_path"].exists.return_value = True
+    mock_dependencies["iter_json_files"].return_value = []
+    videos = [{"video_id": "vid1"}, {"video_id": "vid2"}]
+    mock_dependencies["get_db_data"].side_effect = [videos, videos]
+    mock_dependencies["get_yt_data"].return_value = {"vid1": {}, "vid2": {}}
+    mock_dependencies["process_video"].return_value = True
+    mock_save = mocker.patch(
+        "kfai.extractors.fetch_raw_data._save_videos_to_skip"
+    )
+
+    fetch_raw_data.run()
+
+    mock_save.assert_called_once_with({"vid1", "vid2"})
+
+
+def test_run_saves_skip_file_when_interrupted(mocker, mock_dependencies):
+    """Tests that skips recorded before an error are still persisted."""
+    mock_dependencies["skip_file_path"].exists.return_value = False
+    mock_dependencies["sqlite_path"].exists.return_value = True
+    mock_dependencies["iter_json_files"].return_value = []
+    videos = [{"video_id": "vid1"}, {"video_id": "vid2"}]
+    mock_dependencies["get_db_data"].side_effect = [videos, videos]
+    mock_dependencies["get_yt_data"].return_value = {"vid1": {}, "vid2": {}}
+    mock_dependencies["process_video"].side_effect = [
+        True,
+        KeyboardInterrupt,
+    ]
+    mock_save = mocker.patch(
+        "kfai.extractors.fetch_raw_data._save_videos_to_skip"
+    )
+
+    with pytest.raises(KeyboardInterrupt):
+        fetch_raw_data.run()
+
+    mock_save.assert_called_once_with({"vid1"})
+
+
+def test_run_spaces_requests_from_previous_start(mocker, mock_dependencies):
+    """
+    Tests that the rate limit only sleeps for whatever part of the
+    interval the previous video's processing hasn't already used.
+    """
+    mock_dependencies["skip_file_path"].exists.return_value = False
+    mock_dependencies["sqlite_path"].exists.return_value = True
+    mock_dependencies["iter_json_files"].return_value = []
+    videos = [{"video_id": f"vid{i}"} for i in range(1, 4)]
+    mock_dependencies["get_db_data"].side_effect = [videos, videos]
+    mock_dependencies["get_yt_data"].return_value = {
+        "vid1": {},
+        "vid2": {},
+        "vid3": {},
+    }
+    mock_dependencies["process_video"].return_value = False
+    mocker.patch("kfai.extractors.fetch_raw_data.uniform", return_value=3.0)
+    # Check and request times: vid2 comes 1s in, vid3 comes 5s after vid2
+    mocker.patch(
+        "kfai.extractors.fetch_raw_data.monotonic",
+        side_effect=[100.0, 100.0, 101.0, 103.0, 108.0, 108.0],
+    )
+
+    fetch_raw_data.run()
+
+    # No wait before the first video or after a slow one
+    mock_dependencies["sleep"].assert_called_once_with(2.0)
+
+
+def test_run_limits_videos_in_flight(mocker, mock_dependencies):
+    """Tests that no more than FETCH_WORKERS videos run at once."""
+    mock_dependencies["skip_file_path"].exists.return_value = False
+    mock_dependencies["sqlite_path"].exists.return_value = True
+    mock_dependencies["iter_json_files"].return_value = []
+    videos = [{"video_id": f"vid{i}"} for i in range(1, 5)]
+    mock_dependencies["get_db_data"].side_effect = [videos, videos]
+    mock_dependencies["get_yt_data"].return_value = {
+        video["video_id"]: {} for video in videos
+    }
+    mocker.patch.object(fetch_raw_data, "FETCH_WORKERS", 2)
+    in_flight, peak = [], []
+
+    def fake_process_video(video_record):
+        in_flight.append(video_record["video_id"])
+        peak.append(len(in_flight))
+        time.sleep(0.01)
+        in_flight.remove(video_record["video_id"])
+        return False
+
+    mock_dependencies["process_video"].side_effect = fake_process_video
+
+    fetch_raw_data.run()
+
+    assert mock_dependencies["process_video"].call_count == 4
+    assert max(peak) <= 2
+
+
+def test_run_stops_submitting_after_worker_error(mocker, mock_dependencies):
+    """Tests that an error in one video stops later videos from starting."""
+    mock_dependencies["skip_file_path"].exists.return_value = False
+    mock_dependencies["sqlite_path"].exists.return_value = True
+    mock_dependencies["iter_json_files"].return_value = []
+    videos = [{"video_id": "vid1"}, {"video_id": "vid2"}]
+    mock_dependencies["get_db_data"].side_effect = [videos, videos]
+    mock_dependencies["get_yt_data"].return_value = {"vid1": {}, "vid2": {}}
+    mock_dependencies["process_video"].side_effect = OSError("Disk full")
+    mocker.patch.object(fetch_raw_data, "FETCH_WORKERS", 1)
+
+    with pytest.raises(OSError, match="Disk full"):
+        fetch_raw_data.run()
+
+    mock_dependencies["process_video"].assert_called_once()
@@ -1,3 +1,4 @@
+import orjson
 import pytest
 
 from kfai.extractors import process_failed_videos
@@ -24,7 +25,6 @@ def mock_dependencies(mocker):
         "get_yt_data": mocker.patch(
             "kfai.extractors.process_failed_videos.get_youtube_data"
         ),
-        "dump": mocker.patch("json.dump"),
         "print": mocker.patch("builtins.print"),
         "skip_file_path": mock_skip_file,
         "failed_file_path": mock_failed_file,
@@ -75,8 +75,8 @@ def test_run_happy_path(mocker, mock_dependencies):
     mock_dependencies["get_yt_data"].assert_called_once_with(["vid1", "vid2"])
 
     # Verify the final JSON was dumped with correctly merged data
-    mock_dependencies["dump"].assert_called_once()
-    dumped_data = mock_dependencies["dump"].call_args[0][0]
+    mock_output_open.assert_called_once_with("wb")
+    dumped_data = orjson.loads(mock_output_open().write.call_args[0][0])
     assert len(dumped_data) == 2
     assert dumped_data[0] == {
         "video_id": "vid1",
@@ -128,8 +128,8 @@ def test_run_handles_youtube_api_error(mocker, mock_dependencies):
     # Act
     process_failed_videos.run()
 
-    # Assert: The final dump should never be called
-    mock_dependencies["dump"].assert_not_called()
+    # Assert: The output file should never be written
+    mock_dependencies["failed_file_path"].open.assert_not_called()
 
 
 def test_run_handles_partial_youtube_data(mocker, mock_dependencies):
@@ -151,8 +151,9 @@ def test_run_handles_partial_youtube_data(mocker, mock_dependencies):
     mock_dependencies["get_yt_data"].return_value = {
         "vid1": {"yt_data": "api_value1"}
     }
+    mock_output_open = mocker.mock_open()
     mocker.patch.object(
-        mock_dependencies["failed_file_path"], "open", mocker.mock_open()
+        mock_dependencies["failed_file_path"], "open", mock_output_open
     )
 
     # Act
@@ -166,6 +167,6 @@ def test_run_handles_partial_youtube_data(mocker, mock_dependencies):
         f" ID: {video_id}"
     )
     # The final dumped data should only contain the one successful video
-    dumped_data = mock_dependencies["dump"].call_args[0][0]
+    dumped_data = orjson.loads(mock_output_open().write.call_args[0][0])
     assert len(dumped_data) == 1
     assert dumped_data[0]["video_id"] == "vid1"
@@ -1,6 +1,7 @@
 import json
 from unittest.mock import MagicMock
 
+import orjson
 import pytest
 
 from kfai.extractors import transcribe_failures
@@ -20,7 +21,6 @@ def mock_deps(mocker):
         "chunk_transcript": mocker.patch(
             "kfai.extractors.transcribe_failures.chunk_transcript_with_overlap"
         ),
-        "dump": mocker.patch("json.dump"),
         "print": mocker.patch("builtins.print"),
         "whisper_load": mocker.patch(
             "whisper.load_model", return_value=MagicMock()
@@ -31,6 +31,10 @@ def mock_deps(mocker):
         "raw_json_dir_path": mocker.patch(
             "kfai.extractors.transcribe_failures.RAW_JSON_DIR"
         ),
+        "iter_json_files": mocker.patch(
+            "kfai.extractors.transcribe_failures.iter_json_files",
+            return_value=[],
+        ),
         "temp_data_dir": mocker.patch(
             "kfai.extractors.transcribe_failures.TEMP_DATA_DIR"
         ),
@@ -54,13 +58,12 @@ SAMPLE_VIDEO = {
 
 
 # --- Helper for Mocking Paths ---
-def setup_path_mocks(mocker, mock_deps, output_exists=False):
+def setup_path_mocks(mocker, mock_deps):
     """
     Helper to correctly configure the three-level chained path mock.
     RAW_JSON_DIR / year / month / filename
     """
     mock_output_path = MagicMock()
-    mock_output_path.exists.return_value = output_exists
     # This correctly mocks the three '/' operations
     mock_deps[
         "raw_json_dir_path"
@@ -68,6 +71,7 @@ def setup_path_mocks(mocker, mock_deps, output_exists=False):
         mock_output_path
     )
     mocker.patch.object(mock_output_path, "open", mocker.mock_open())
+    return mock_output_path
 
 
 # --- Test Suite ---
@@ -84,9 +88,7 @@ def test_run_happy_path(mocker, mock_deps):
         "open",
         mocker.mock_open(read_data=json.dumps([SAMPLE_VIDEO])),
     )
-    setup_path_mocks(
-        mocker, mock_deps, output_exists=False
-    )  # Critical: output does NOT exist
+    mock_output_path = setup_path_mocks(mocker, mock_deps)
     mock_chunk_path1, mock_chunk_path2 = MagicMock(), MagicMock()
     mock_deps["download_audio"].return_value = [
         mock_chunk_path1,
@@ -106,7 +108,9 @@ def test_run_happy_path(mocker, mock_deps):
     assert mock_deps["transcribe_whisper"].call_count == 2
     final_raw_transcript = mock_deps["chunk_transcript"].call_args[0][0]
     assert final_raw_transcript[1]["start"] == 110.0
-    mock_deps["dump"].assert_called_once()
+    mock_output_path.open.assert_called_once_with("wb")
+    written = mock_output_path.open().write.call_args[0][0]
+    assert orjson.loads(written)["transcript_chunks"] == ["final_chunk"]
     mock_chunk_path1.unlink.assert_called_once()
 
 
@@ -142,10 +146,12 @@ def test_run_skips_videos(mocker, mock_deps, video_id, output_exists):
         mocker.mock_open(read_data=json.dumps([video_record])),
     )
     if output_exists:
-        setup_path_mocks(mocker, mock_deps, output_exists=True)
+        mock_deps["iter_json_files"].return_value = [MagicMock(stem=video_id)]
 
     transcribe_failures.run()
     mock_deps["download_audio"].assert_not_called()
+    # No output directories are created for skipped videos
+    mock_deps["raw_json_dir_path"].__truediv__.assert_not_called()
 
 
 def test_run_handles_download_failure(mocker, mock_deps):
@@ -155,7 +161,7 @@ def test_run_handles_download_failure(mocker, mock_deps):
         "open",
         mocker.mock_open(read_data=json.dumps([SAMPLE_VIDEO])),
     )
-    setup_path_mocks(mocker, mock_deps, output_exists=False)
+    setup_path_mocks(mocker, mock_deps)
     mock_deps["download_audio"].return_value = None
 
     transcribe_failures.run()
@@ -172,7 +178,7 @@ def test_run_handles_transcription_failure(mocker, mock_deps):
         "open",
         mocker.mock_open(read_data=json.dumps([SAMPLE_VIDEO])),
     )
-    setup_path_mocks(mocker, mock_deps, output_exists=False)
+    mock_output_path = setup_path_mocks(mocker, mock_deps)
     mock_chunk_path = MagicMock()
     mock_deps["download_audio"].return_value = [mock_chunk_path]
     mock_deps["transcribe_whisper"].return_value = None
@@ -182,4 +188,4 @@ def test_run_handles_transcription_failure(mocker, mock_deps):
         "  !! No transcript data generated... skipping."
     )
     mock_chunk_path.unlink.assert_called_once()
-    mock_deps["dump"].assert_not_called()
+    mock_output_path.open.assert_not_called()
@@ -1,4 +1,5 @@
 import sqlite3
+from contextlib import closing
 from unittest.mock import MagicMock
 
 import pytest
@@ -48,6 +49,20 @@ def test_create_local_sqlite_db(mocker):
     mock_export.assert_called_with(expected_config)
 
 
+# --- Tests for _connect_sqlite ---
+
+
+def test_connect_sqlite_applies_pragmas(mocker, tmp_path):
+    """Tests that connections use WAL with relaxed syncing."""
+    mocker.patch.object(db_utils, "SQLITE_DB_PATH", tmp_path / "db.sqlite")
+
+    conn = db_utils._connect_sqlite()
+
+    assert conn.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+    assert conn.execute("PRAGMA synchronous").fetchone() == (1,)  # NORMAL
+    conn.close()
+
+
 # --- Tests for get_video_db_data (the read function) ---
 
 
@@ -70,7 +85,7 @@ def test_get_video_db_data_fetches_all(mock_sqlite_connect):
         (1, "vid1", "Show A", "Host1,Host2"),
         (2, "vid2", "Show B", "Host3"),
     ]
-    mock_cursor.fetchall.return_value = mock_rows
+    mock_cursor.fetchmany.side_effect = [mock_rows, []]
 
     # 2. Act
     video_data = db_utils.get_video_db_data()
@@ -83,6 +98,7 @@ def test_get_video_db_data_fetches_all(mock_sqlite_connect):
     assert video_data[0]["video_id"] == "vid1"
     assert video_data[0]["hosts"] == ["Host1", "Host2"]
     assert video_data[1]["hosts"] == ["Host3"]
+    assert mock_cursor.arraysize == db_utils.SQLITE_FETCH_SIZE
     mock_conn.close.assert_called_once()
 
 
@@ -90,7 +106,7 @@ def test_get_video_db_data_fetches_specific_ids(mock_sqlite_connect):
     """Tests fetching data for a specific list of video IDs."""
     # 1. Arrange
     _, mock_cursor = mock_sqlite_connect
-    mock_cursor.fetchall.return_value = [(1, "vid1", "Show A", "Host1")]
+    mock_cursor.fetchmany.side_effect = [[(1, "vid1", "Show A", "Host1")], []]
 
     # 2. Act
     video_data = db_utils.get_video_db_data(video_ids=["vid1", "vid3"])
@@ -104,12 +120,34 @@ def test_get_video_db_data_fetches_specific_ids(mock_sqlite_connect):
     assert len(video_data) == 1
 
 
+def test_get_video_db_data_batches_large_id_lists(mocker, mock_sqlite_connect):
+    """Tests that ID lists over the parameter limit are queried in batches."""
+    # 1. Arrange
+    _, mock_cursor = mock_sqlite_connect
+    mocker.patch.object(db_utils, "SQLITE_MAX_VARIABLES", 2)
+    mock_cursor.fetchmany.side_effect = [
+        [(1, "vid1", "Show A", "Host1")],
+        [],
+        [(3, "vid3", "Show A", None)],
+        [],
+    ]
+
+    # 2. Act
+    video_data = db_utils.get_video_db_data(video_ids=["vid1", "vid2", "vid3"])
+
+    # 3. Assert
+    params = [c.args[1] for c in mock_cursor.execute.call_args_list]
+    assert params == [["vid1", "vid2"], ["vid3"]]
+    assert "IN (?)" in mock_cursor.execute.call_args[0][0]
+    assert [v["video_id"] for v in video_data] == ["vid1", "vid3"]
+
+
 def test_get_video_db_data_handles_null_hosts(mock_sqlite_connect):
     """Tests that a NULL value for hosts is correctly handled."""
     # 1. Arrange
     _, mock_cursor = mock_sqlite_connect
     # Simulate a row where the GROUP_CONCAT result is None
-    mock_cursor.fetchall.return_value = [(1, "vid1", "Show A", None)]
+    mock_cursor.fetchmany.side_effect = [[(1, "vid1", "Show A", None)], []]
 
     # 2. Act
     video_data = db_utils.get_video_db_data()
@@ -123,19 +161,24 @@ def test_get_video_db_data_handles_null_hosts(mock_sqlite_connect):
 
 
 @pytest.fixture
-def mock_db_connections(mocker):
+def mock_db_connections(mocker, tmp_path):
     """Fixture to mock both MySQL and SQLite connections."""
+    mocker.patch.object(db_utils, "SQLITE_DB_PATH", tmp_path / "db.sqlite")
     # Mock MySQL
     mock_mysql_conn = MagicMock()
     mock_mysql_cursor = MagicMock()
     mocker.patch("mysql.connector.connect").return_value = mock_mysql_conn
     mock_mysql_conn.cursor.return_value = mock_mysql_cursor
-    # Simulate fetchall returning different data for each query
-    mock_mysql_cursor.fetchall.side_effect = [
+    # Simulate one batch per query, each followed by an empty fetch
+    mock_mysql_cursor.fetchmany.side_effect = [
         [{"id": 1}],  # videos
+        [],
         [{"id": 2}],  # shows
+        [],
         [{"id": 3}],  # hosts
+        [],
         [{"video_id": 4}],  # video_hosts
+        [],
     ]
 
     # Mock SQLite
@@ -155,7 +198,9 @@ def mock_db_connections(mocker):
 def test_export_mysql_to_sqlite_happy_path(mock_db_connections):
     """Tests the successful export from MySQL to SQLite."""
     # 1. Arrange
-    mock_mysql_conn, _, sqlite_conn, sqlite_cursor = mock_db_connections
+    mock_mysql_conn, mysql_cursor, sqlite_conn, sqlite_cursor = (
+        mock_db_connections
+    )
 
     # 2. Act
     db_utils._export_mysql_to_sqlite(
@@ -163,8 +208,13 @@ def test_export_mysql_to_sqlite_happy_path(mock_db_connections):
     )  # Config doesn't matter as it's mocked
 
     # 3. Assert
-    # Verify all CREATE TABLE statements were executed
-    assert sqlite_cursor.execute.call_count == 4
+    # Verify one transaction wraps the rebuild
+    assert sqlite_cursor.execute.call_count == 11
+    assert sqlite_cursor.execute.call_args_list[0].args == ("BEGIN IMMEDIATE",)
+    # Verify indexes are built after the bulk load
+    assert "CREATE INDEX" in sqlite_cursor.execute.call_args[0][0]
+    # Verify rows were streamed rather than fetched all at once
+    mysql_cursor.fetchall.assert_not_called()
     # Verify all INSERT statements were executed
     assert sqlite_cursor.executemany.call_count == 4
     # Verify the correct data was passed to an insert
@@ -177,13 +227,15 @@ def test_export_mysql_to_sqlite_happy_path(mock_db_connections):
     )
     # Verify commit and close were called
     sqlite_conn.commit.assert_called_once()
+    sqlite_conn.rollback.assert_not_called()
     mock_mysql_conn.close.assert_called_once()
     sqlite_conn.close.assert_called_once()
 
 
-def test_export_mysql_error(mocker):
-    """Tests that an error connecting to MySQL is handled gracefully."""
+def test_export_mysql_error(mocker, tmp_path):
+    """Tests that an error connecting to MySQL is reported and raised."""
     # 1. Arrange
+    mocker.patch.object(db_utils, "SQLITE_DB_PATH", tmp_path / "db.sqlite")
     # Import the actual Error class to be raised
     from mysql.connector import Error as MySQLError
 
@@ -194,7 +246,8 @@ def test_export_mysql_error(mocker):
     mock_print = mocker.patch("builtins.print")
 
     # 2. Act
-    db_utils._export_mysql_to_sqlite({})
+    with pytest.raises(MySQLError):
+        db_utils._export_mysql_to_sqlite({})
 
     # 3. Assert
     # SQLite should never have been touched because the MySQL error happened
@@ -203,16 +256,60 @@ def test_export_mysql_error(mocker):
     mock_print.assert_any_call("Error connecting to MySQL: Unknown error")
 
 
-def test_export_sqlite_error(mocker):
-    """Tests that an error connecting to SQLite is handled gracefully."""
+def test_export_sqlite_error(mocker, tmp_path):
+    """Tests that an error connecting to SQLite is reported and raised."""
     # 1. Arrange
+    mocker.patch.object(db_utils, "SQLITE_DB_PATH", tmp_path / "db.sqlite")
     mock_mysql_conn = MagicMock()
     mocker.patch("mysql.connector.connect").return_value = mock_mysql_conn
     mocker.patch("sqlite3.connect", side_effect=sqlite3.Error)
 
     # 2. Act
-    db_utils._export_mysql_to_sqlite({})
+    with pytest.raises(sqlite3.Error):
+        db_utils._export_mysql_to_sqlite({})
 
     # 3. Assert
     # The MySQL connection should still be closed in the 'finally' block
     mock_mysql_conn.close.assert_called_once()
+
+
+def test_export_rolls_back_on_failure(mock_db_connections):
+    """Tests that a failure mid-export rolls the transaction back."""
+    _, mysql_cursor, sqlite_conn, _ = mock_db_connections
+    mysql_cursor.fetchmany.side_effect = sqlite3.OperationalError("boom")
+
+    with pytest.raises(sqlite3.OperationalError):
+        db_utils._export_mysql_to_sqlite({})
+
+    sqlite_conn.commit.assert_not_called()
+    sqlite_conn.rollback.assert_called_once()
+    sqlite_conn.close.assert_called_once()
+
+
+@pytest.mark.parametrize("db_existed", [False, True])
+def test_export_failure_rolls_back(mocker, tmp_path, db_existed):
+    """Tests that a failed export is rolled back, and that a database file
+    created by the failed export is removed again.
+    """
+    # 1. Arrange
+    db_path = tmp_path / "db.sqlite"
+    if db_existed:
+        db_path.write_bytes(b"")
+    mocker.patch.object(db_utils, "SQLITE_DB_PATH", db_path)
+    mock_mysql_cursor = MagicMock()
+    mocker.patch(
+        "mysql.connector.connect"
+    ).return_value.cursor.return_value = mock_mysql_cursor
+    mock_mysql_cursor.fetchmany.side_effect = sqlite3.OperationalError("boom")
+
+    # 2. Act
+    with pytest.raises(sqlite3.OperationalError):
+        db_utils._export_mysql_to_sqlite({})
+
+    # 3. Assert
+    assert db_path.exists() is db_existed
+    if db_existed:
+        # The partial rebuild left no tables behind
+        with closing(sqlite3.connect(db_path)) as conn:
+            tables = conn.execute("SELECT name FROM sqlite_master").fetchall()
+        assert tables == []
@@ -35,9 +35,16 @@ def mock_dependencies(mocker):
     mock_year_dir.__truediv__.return_value = mock_month_dir
     mock_month_dir.__truediv__.return_value = mock_output_path
 
+    # Start each test with no directories created
+    mocker.patch.object(processing_utils, "_created_dirs", set())
+
     # Mock the file writer
-    mock_dump = mocker.patch("kfai.extractors.utils.helpers.processing.dump")
-    mock_print = mocker.patch("builtins.print")
+    mock_dump = mocker.patch(
+        "kfai.extractors.utils.helpers.processing.dumps", return_value=b"{}"
+    )
+    mock_write = mocker.patch(
+        "kfai.extractors.utils.helpers.processing.tqdm.write"
+    )
 
     return {
         "get_transcript": mock_get_transcript,
@@ -46,7 +53,7 @@ def mock_dependencies(mocker):
         "output_path": mock_output_path,
         "subdir_path": mock_month_dir,
         "dump": mock_dump,
-        "print": mock_print,
+        "write": mock_write,
     }
 
 
@@ -92,6 +99,28 @@ def test_process_video_happy_path(mock_dependencies):
     ]
 
 
+def test_process_video_creates_each_directory_once(mock_dependencies):
+    """Tests that a month directory is only created for its first video."""
+    # 1. Arrange
+    mock_dependencies["output_path"].exists.return_value = False
+    mock_dependencies["get_transcript"].return_value = [{"text": "hi"}]
+    mock_dependencies["chunk_transcript"].return_value = [
+        {"start": 0, "text": "chunk1"}
+    ]
+
+    # 2. Act
+    for video_id in ("vid1", "vid2"):
+        processing_utils.process_video(
+            SAMPLE_VIDEO_RECORD | {"video_id": video_id}
+        )
+
+    # 3. Assert
+    assert mock_dependencies["dump"].call_count == 2
+    mock_dependencies["subdir_path"].mkdir.assert_called_once_with(
+        parents=True, exist_ok=True
+    )
+
+
 def test_process_video_already_exists(mock_dependencies):
     """Tests that the function exits early if the output file already
     exists.
@@ -126,6 +155,8 @@ def test_process_video_transcription_fails(mock_dependencies):
     # 3. Assert
     assert result is True  # Should be skipped next run
     mock_dependencies["dump"].assert_not_called()
+    # No output directory is created for a video that isn't saved
+    mock_dependencies["subdir_path"].mkdir.assert_not_called()
 
 
 def test_process_video_empty_chunks(mock_dependencies):
@@ -145,7 +176,7 @@ def test_process_video_empty_chunks(mock_dependencies):
 
     # 3. Assert
     assert result is False
-    mock_dependencies["print"].assert_called_once_with(
+    mock_dependencies["write"].assert_called_once_with(
         "Warning: Transcript for vid1 was empty after chunking."
     )
     mock_dependencies["dump"].assert_not_called()
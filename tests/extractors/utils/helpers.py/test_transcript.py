@@ -1,6 +1,11 @@
 from unittest.mock import MagicMock
 
 import pytest
+from youtube_transcript_api import (
+    AgeRestricted,
+    NoTranscriptFound,
+    TranscriptsDisabled,
+)
 
 from kfai.extractors.utils.helpers import transcript as transcript_utils
 
@@ -38,11 +43,12 @@ def test_get_raw_transcript_data_happy_path(mock_yt_transcript_api):
     )
 
 
-def test_get_raw_transcript_data_subtitles_disabled(mock_yt_transcript_api):
-    """Tests that the video_id is returned if subtitles are disabled."""
-    mock_yt_transcript_api.fetch.side_effect = Exception(
-        "Subtitles are disabled for this video"
-    )
+@pytest.mark.parametrize("error", [TranscriptsDisabled, AgeRestricted])
+def test_get_raw_transcript_data_subtitles_disabled(
+    mock_yt_transcript_api, error
+):
+    """Tests that the video_id is returned if subtitles are unavailable."""
+    mock_yt_transcript_api.fetch.side_effect = error("vid1")
     result = transcript_utils.get_raw_transcript_data("vid1")
     assert result == "vid1"
 
@@ -61,8 +67,8 @@ def test_get_raw_transcript_data_translation_success(mock_yt_transcript_api):
         mock_translated_snippet
     ]
 
-    mock_yt_transcript_api.fetch.side_effect = Exception(
-        "No transcripts were found"
+    mock_yt_transcript_api.fetch.side_effect = NoTranscriptFound(
+        "vid1", ["en"], MagicMock()
     )
     mock_yt_transcript_api.list.return_value = [mock_translatable_transcript]
 
@@ -80,8 +86,8 @@ def test_get_raw_transcript_data_translation_success(mock_yt_transcript_api):
 def test_get_raw_transcript_data_no_translatable_found(mock_yt_transcript_api):
     """Tests the case where no translatable transcripts are found."""
     mock_non_translatable = MagicMock(is_translatable=False)
-    mock_yt_transcript_api.fetch.side_effect = Exception(
-        "No transcripts were found"
+    mock_yt_transcript_api.fetch.side_effect = NoTranscriptFound(
+        "vid1", ["en"], MagicMock()
     )
     mock_yt_transcript_api.list.return_value = [mock_non_translatable]
 
@@ -95,8 +101,8 @@ def test_get_raw_transcript_data_translation_fails(mock_yt_transcript_api):
     mock_translatable_transcript.translate.side_effect = Exception(
         "Translation API failed"
     )
-    mock_yt_transcript_api.fetch.side_effect = Exception(
-        "No transcripts were found"
+    mock_yt_transcript_api.fetch.side_effect = NoTranscriptFound(
+        "vid1", ["en"], MagicMock()
     )
     mock_yt_transcript_api.list.return_value = [mock_translatable_transcript]
 
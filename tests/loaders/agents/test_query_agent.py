@@ -53,10 +53,36 @@ def mocked_agent(mocker):
 
     agent = QueryAgent(llm=MagicMock())
     agent.vector_store = MagicMock()
+    agent.embeddings = MagicMock()
+    agent.embeddings.embed_documents.side_effect = lambda texts: [
+        [0.0] for _ in texts
+    ]
     agent.qa_chain = mock_chain
     return agent
 
 
+def test_init_loads_embeddings_in_half_precision(mocker):
+    """Tests that queries load the embedding model with the build's dtype."""
+    mock_embeddings = mocker.patch(
+        "kfai.loaders.agents.query_agent.HuggingFaceEmbeddings"
+    )
+    mocker.patch("kfai.loaders.agents.query_agent.PGVector")
+    mocker.patch("kfai.loaders.agents.query_agent.create_engine")
+    mocker.patch(
+        "kfai.loaders.agents.query_agent.get_unique_metadata",
+        return_value=([], []),
+    )
+    mocker.patch("kfai.loaders.agents.query_agent.PydanticOutputParser")
+    mocker.patch("kfai.loaders.agents.query_agent.PromptTemplate")
+
+    QueryAgent(llm=MagicMock())
+
+    mock_embeddings.assert_called_once_with(
+        model_name="mixedbread-ai/mxbai-embed-large-v1",
+        model_kwargs={"model_kwargs": {"torch_dtype": "float16"}},
+    )
+
+
 # --- Test Suite ---
 
 
@@ -70,16 +96,41 @@ def test_retrieve_documents_happy_path(mocker, mocked_agent):
         return_value={"$and": []},
     )
     docs_with_scores = [
-        (SAMPLE_DOCS[0], 0.9),
-        (SAMPLE_DOCS[1], 0.8),
-        (SAMPLE_DOCS[0], 0.7),
+        (SAMPLE_DOCS[0], 0.1),
+        (SAMPLE_DOCS[1], 0.2),
+        (SAMPLE_DOCS[0], 0.3),
     ]
-    mocked_agent.vector_store.similarity_search_with_relevance_scores.return_value = docs_with_scores  # noqa: E501
+    mocked_agent.vector_store.similarity_search_with_score_by_vector.return_value = docs_with_scores  # noqa: E501
     docs = mocked_agent._retrieve_documents("query")
     assert docs is not None
     assert len(docs) == 2
 
 
+def test_retrieve_documents_embeds_topic_queries_once(mocker, mocked_agent):
+    """All topic queries are embedded in one call, then searched by vector."""
+    mocker.patch(
+        "kfai.loaders.agents.query_agent.parse_query",
+        return_value=QueryParseResponse(topics=["a", "b", "c"]),
+    )
+    base_filter = {"$and": [{"show_name": {"$in": ["S1"]}}]}
+    mocker.patch(
+        "kfai.loaders.agents.query_agent.build_filter",
+        return_value=base_filter,
+    )
+    mocked_agent.vector_store.similarity_search_with_score_by_vector.return_value = []  # noqa: E501
+
+    mocked_agent._retrieve_documents("query")
+
+    mocked_agent.embeddings.embed_documents.assert_called_once_with(
+        ["b, c", "a, c", "a, b"]
+    )
+    search_calls = mocked_agent.vector_store.similarity_search_with_score_by_vector.call_args_list  # noqa: E501
+    assert len(search_calls) == 3
+    # Each topic adds its own condition without touching the shared filter
+    assert all(len(c.kwargs["filter"]["$and"]) == 2 for c in search_calls)
+    assert base_filter == {"$and": [{"show_name": {"$in": ["S1"]}}]}
+
+
 @pytest.mark.parametrize(
     "parse_return, build_return",
     [
@@ -111,7 +162,7 @@ def test_retrieve_documents_no_docs_found(mocker, mocked_agent):
         "kfai.loaders.agents.query_agent.build_filter",
         return_value={"$and": []},
     )
-    mocked_agent.vector_store.similarity_search_with_relevance_scores.return_value = []  # noqa: E501
+    mocked_agent.vector_store.similarity_search_with_score_by_vector.return_value = []  # noqa: E501
     assert mocked_agent._retrieve_documents("query") is None
 
 
@@ -263,17 +314,17 @@ def test_retrieve_documents_no_filter_dict(mocker, mocked_agent):
     mocker.patch(
         "kfai.loaders.agents.query_agent.build_filter", return_value=None
     )
-    mocked_agent.vector_store.similarity_search_with_relevance_scores.return_value = []  # noqa: E501
+    mocked_agent.vector_store.similarity_search_with_score_by_vector.return_value = []  # noqa: E501
 
     # Act
     mocked_agent._retrieve_documents("query")
 
     # Assert
     # The vector store should have been called once (for the one topic).
-    mocked_agent.vector_store.similarity_search_with_relevance_scores.assert_called_once()  # noqa: E501
+    mocked_agent.vector_store.similarity_search_with_score_by_vector.assert_called_once()  # noqa: E501
 
     # Get the arguments passed to the call
-    call_kwargs = mocked_agent.vector_store.similarity_search_with_relevance_scores.call_args.kwargs  # noqa: E501
+    call_kwargs = mocked_agent.vector_store.similarity_search_with_score_by_vector.call_args.kwargs  # noqa: E501
 
     # Verify the filter was constructed correctly from an empty base
     expected_filter = {
@@ -308,8 +359,8 @@ def test_retrieve_documents_breaks_at_context_limit(mocker, mocked_agent):
         return_value={"$and": []},
     )
     # Provide more unique docs (2) than the mocked CONTEXT_COUNT (1)
-    docs_with_scores = [(SAMPLE_DOCS[0], 0.9), (SAMPLE_DOCS[1], 0.8)]
-    mocked_agent.vector_store.similarity_search_with_relevance_scores.return_value = docs_with_scores  # noqa: E501
+    docs_with_scores = [(SAMPLE_DOCS[0], 0.1), (SAMPLE_DOCS[1], 0.2)]
+    mocked_agent.vector_store.similarity_search_with_score_by_vector.return_value = docs_with_scores  # noqa: E501
 
     # Act
     docs = mocked_agent._retrieve_documents("query")
@@ -331,7 +382,7 @@ def test_process_query_cli_prints_duration(mocker, mocked_agent):
     )
     mock_print = mocker.patch("builtins.print")
     mocker.patch(
-        "time.time", side_effect=[100.0, 105.5]
+        "time.perf_counter", side_effect=[100.0, 105.5]
     )  # Mock start and end time
 
     mocked_agent.process_query("query", is_gui=False)
@@ -45,7 +45,9 @@ def test_run_happy_path(mocker):
     """
     # 1. Arrange: Mock all external dependencies
     # Mock classes and constants
-    mocker.patch("kfai.loaders.build_vector_store.HuggingFaceEmbeddings")
+    mock_embeddings_class = mocker.patch(
+        "kfai.loaders.build_vector_store.HuggingFaceEmbeddings"
+    )
     mock_pgvector_class = mocker.patch(
         "kfai.loaders.build_vector_store.PGVector"
     )
@@ -59,6 +61,9 @@ def test_run_happy_path(mocker):
         "kfai.loaders.build_vector_store.get_processed_chunk_ids",
         return_value={("vid2", 30.0)},  # Simulate one chunk already in the DB
     )
+    mock_create_index = mocker.patch(
+        "kfai.loaders.build_vector_store.create_hnsw_index"
+    )
 
     # Mock file system operations
     mock_json_dir = mocker.patch(
@@ -69,7 +74,10 @@ def test_run_happy_path(mocker):
     # Use mock_open to simulate reading from the mock files
     mock_file1.open = mocker.mock_open(read_data=FAKE_JSON_DATA_1)
     mock_file2.open = mocker.mock_open(read_data=FAKE_JSON_DATA_2)
-    mock_json_dir.rglob.return_value = [mock_file1, mock_file2]
+    mock_iter_json_files = mocker.patch(
+        "kfai.loaders.build_vector_store.iter_json_files",
+        return_value=[mock_file1, mock_file2],
+    )
 
     # Mock print to check the final summary
     mock_print = mocker.patch("builtins.print")
@@ -78,8 +86,14 @@ def test_run_happy_path(mocker):
     build_vector_store.run()
 
     # 3. Assert
+    embeddings_kwargs = mock_embeddings_class.call_args.kwargs
+    assert embeddings_kwargs["model_kwargs"]["model_kwargs"] == {
+        "torch_dtype": "float16"
+    }
     mock_get_processed.assert_called_once()
-    mock_json_dir.rglob.assert_called_with("*.json")
+    mock_create_index.assert_called_once()
+    assert mock_pgvector_class.call_args.kwargs["embedding_length"] == 1024
+    mock_iter_json_files.assert_called_once_with(mock_json_dir)
 
     # Assert that add_documents was called twice:
     # Once for the full batch, once for the final
@@ -124,12 +138,13 @@ def test_run_db_insertion_fails(mocker):
         "kfai.loaders.build_vector_store.get_processed_chunk_ids",
         return_value=set(),
     )
-    mock_json_dir = mocker.patch(
-        "kfai.loaders.build_vector_store.JSON_SOURCE_DIR"
-    )
+    mocker.patch("kfai.loaders.build_vector_store.create_hnsw_index")
     mock_file = MagicMock()
     mock_file.open = mocker.mock_open(read_data=FAKE_JSON_DATA_1)
-    mock_json_dir.rglob.return_value = [mock_file]
+    mocker.patch(
+        "kfai.loaders.build_vector_store.iter_json_files",
+        return_value=[mock_file],
+    )
     mock_print = mocker.patch("builtins.print")
 
     # 2. Act
@@ -161,12 +176,13 @@ def test_run_no_new_documents(mocker):
         "kfai.loaders.build_vector_store.get_processed_chunk_ids",
         return_value={("vid1", 10.0), ("vid1", 20.0)},
     )
-    mock_json_dir = mocker.patch(
-        "kfai.loaders.build_vector_store.JSON_SOURCE_DIR"
-    )
+    mocker.patch("kfai.loaders.build_vector_store.create_hnsw_index")
     mock_file = MagicMock()
     mock_file.open = mocker.mock_open(read_data=FAKE_JSON_DATA_1)
-    mock_json_dir.rglob.return_value = [mock_file]
+    mocker.patch(
+        "kfai.loaders.build_vector_store.iter_json_files",
+        return_value=[mock_file],
+    )
     mock_print = mocker.patch("builtins.print")
 
     # 2. Act
@@ -194,6 +210,7 @@ def test_run_skips_file_with_no_video_id(mocker):
         "kfai.loaders.build_vector_store.get_processed_chunk_ids",
         return_value=set(),
     )
+    mocker.patch("kfai.loaders.build_vector_store.create_hnsw_index")
 
     # Create a fake JSON string that is missing the 'video_id' key
     json_missing_id = json.dumps(
@@ -204,12 +221,12 @@ def test_run_skips_file_with_no_video_id(mocker):
     )
 
     # Mock the file system to return only this malformed file
-    mock_json_dir = mocker.patch(
-        "kfai.loaders.build_vector_store.JSON_SOURCE_DIR"
-    )
     mock_file = MagicMock()
     mock_file.open = mocker.mock_open(read_data=json_missing_id)
-    mock_json_dir.rglob.return_value = [mock_file]
+    mocker.patch(
+        "kfai.loaders.build_vector_store.iter_json_files",
+        return_value=[mock_file],
+    )
     mock_print = mocker.patch("builtins.print")
 
     # 2. Act
@@ -223,3 +240,24 @@ def test_run_skips_file_with_no_video_id(mocker):
     # Check the final summary to confirm nothing was added or skipped
     mock_print.assert_any_call("  - Added 0 new documents to the collection.")
     mock_print.assert_any_call("  - Skipped 0 documents that already existed.")
+
+
+def test_iter_video_data_preserves_order_with_small_prefetch(mocker):
+    """
+    Tests that files are yielded in walk order even when the prefetch
+    window is smaller than the number of files.
+    """
+    # 1. Arrange
+    mocker.patch("kfai.loaders.build_vector_store.LOAD_PREFETCH", 1)
+    mock_file1 = MagicMock()
+    mock_file2 = MagicMock()
+    mock_file1.open = mocker.mock_open(read_data=FAKE_JSON_DATA_1)
+    mock_file2.open = mocker.mock_open(read_data=FAKE_JSON_DATA_2)
+
+    # 2. Act
+    video_data = list(
+        build_vector_store._iter_video_data([mock_file1, mock_file2])
+    )
+
+    # 3. Assert
+    assert [v["video_id"] for v in video_data] == ["vid1", "vid2"]
@@ -1,5 +1,7 @@
 from unittest.mock import MagicMock
 
+import pytest
+
 from kfai.loaders.utils.helpers import database as db_utils
 
 # --- Tests for get_processed_chunk_ids ---
@@ -102,3 +104,55 @@ def test_get_unique_metadata_empty_db(mocker):
     # 3. Assert
     assert show_names == []
     assert hosts == []
+
+
+# --- Tests for create_hnsw_index ---
+
+
+@pytest.mark.parametrize(
+    "typmod, expected_statements",
+    [
+        (-1, 3),  # Untyped column: ALTER before CREATE INDEX
+        (1024, 2),  # Column already has a dimension
+    ],
+)
+def test_create_hnsw_index(mocker, typmod, expected_statements):
+    """
+    Tests that the embedding column is only altered when it has no
+    dimension and that the index is always created.
+    """
+    # 1. Arrange
+    mock_engine = MagicMock()
+    mock_connection = MagicMock()
+    mocker.patch(
+        "kfai.loaders.utils.helpers.database.create_engine",
+        return_value=mock_engine,
+    )
+    mock_engine.begin.return_value.__enter__.return_value = mock_connection
+    mock_connection.execute.return_value.scalar.return_value = typmod
+
+    # 2. Act
+    db_utils.create_hnsw_index()
+
+    # 3. Assert
+    assert mock_connection.execute.call_count == expected_statements
+    last_stmt = str(mock_connection.execute.call_args.args[0])
+    assert "USING hnsw (embedding vector_cosine_ops)" in last_stmt
+
+
+def test_create_hnsw_index_db_error(mocker):
+    """
+    Tests that a database error is reported instead of raised.
+    """
+    # 1. Arrange
+    mocker.patch(
+        "kfai.loaders.utils.helpers.database.create_engine",
+        side_effect=Exception("Connection refused"),
+    )
+    mock_print = mocker.patch("builtins.print")
+
+    # 2. Act
+    db_utils.create_hnsw_index()
+
+    # 3. Assert
+    assert "Connection refused" in mock_print.call_args.args[0]
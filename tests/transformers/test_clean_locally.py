@@ -10,7 +10,7 @@ from kfai.transformers import clean_locally
 def mock_deps(mocker):
     """A single fixture to mock all external dependencies of the run script."""
     # Mock classes and constants
-    mocker.patch("kfai.transformers.clean_locally.OllamaLLM")
+    mocker.patch("kfai.transformers.clean_locally.Client")
     mock_cleaned_json_dir = mocker.patch(
         "kfai.transformers.clean_locally.CLEANED_JSON_DIR"
     )
@@ -19,6 +19,10 @@ def mock_deps(mocker):
     )
     mock_logs_dir = mocker.patch("kfai.transformers.clean_locally.LOGS_DIR")
 
+    # Files found by each directory scan
+    raw_files: list[MagicMock] = []
+    cleaned_files: list[MagicMock] = []
+
     # Function names match imports
     mocks = {
         "load_raw_data": mocker.patch(
@@ -33,8 +37,25 @@ def mock_deps(mocker):
         "save_cleaned_data": mocker.patch(
             "kfai.transformers.clean_locally.save_cleaned_data"
         ),
+        "file_sha256": mocker.patch(
+            "kfai.transformers.clean_locally.file_sha256", return_value="new"
+        ),
+        "load_manifest": mocker.patch(
+            "kfai.transformers.clean_locally.load_manifest", return_value={}
+        ),
+        "save_manifest": mocker.patch(
+            "kfai.transformers.clean_locally.save_manifest"
+        ),
+        "iter_json_files": mocker.patch(
+            "kfai.transformers.clean_locally.iter_json_files",
+            side_effect=lambda root: (
+                raw_files if root is mock_raw_json_dir else cleaned_files
+            ),
+        ),
         "logger": mocker.patch("kfai.transformers.clean_locally.logger"),
         "print": mocker.patch("builtins.print"),
+        "raw_files": raw_files,
+        "cleaned_files": cleaned_files,
         "raw_json_dir": mock_raw_json_dir,
         "cleaned_json_dir": mock_cleaned_json_dir,
         "logs_dir": mock_logs_dir,
@@ -43,6 +64,17 @@ def mock_deps(mocker):
 
 
 # --- Test Data ---
+NEW_ENTRY = {"sha256": "new", "size": 10, "mtime_ns": 2}
+
+
+def _raw_file():
+    """Returns a mock raw file path whose stat matches NEW_ENTRY."""
+    mock_file_path = MagicMock()
+    mock_file_path.stat.return_value.st_size = 10
+    mock_file_path.stat.return_value.st_mtime_ns = 2
+    return mock_file_path
+
+
 SAMPLE_VIDEO_DATA = {
     "video_id": "vid1",
     "transcript_chunks": [{"text": "raw"}],
@@ -54,12 +86,8 @@ SAMPLE_VIDEO_DATA = {
 def test_run_happy_path(mock_deps):
     """Tests the main success path for processing a single new file."""
     # Arrange
-    mock_file_path = MagicMock()
-    mock_deps["raw_json_dir"].rglob.return_value = [mock_file_path]
-
-    mock_cleaned_path = MagicMock()
-    mock_cleaned_path.exists.return_value = False
-    mock_deps["cleaned_json_dir"].__truediv__.return_value = mock_cleaned_path
+    mock_file_path = _raw_file()
+    mock_deps["raw_files"].append(mock_file_path)
 
     mock_deps["load_raw_data"].return_value = SAMPLE_VIDEO_DATA
     mock_deps["clean_transcript"].return_value = {
@@ -78,6 +106,14 @@ def test_run_happy_path(mock_deps):
     mock_deps["check_data_integrity"].assert_called_once()
     mock_deps["save_cleaned_data"].assert_called_once()
     mock_deps["print"].assert_any_call("\nCleaning process complete.")
+    mock_deps["save_manifest"].assert_called_once_with(
+        clean_locally.MANIFEST_FILE,
+        {
+            mock_file_path.relative_to.return_value.as_posix.return_value: (
+                NEW_ENTRY
+            )
+        },
+    )
 
 
 @pytest.mark.parametrize(
@@ -95,14 +131,10 @@ def test_run_happy_path(mock_deps):
 )
 def test_run_skips_videos_for_various_reasons(mock_deps, reason, mock_setup):
     # Arrange
-    mock_file_path = MagicMock()
-    mock_deps["raw_json_dir"].rglob.return_value = [mock_file_path]
-
-    mock_cleaned_path = MagicMock()
-    mock_cleaned_path.exists.return_value = mock_setup.get(
-        "cleaned_exists", False
-    )
-    mock_deps["cleaned_json_dir"].__truediv__.return_value = mock_cleaned_path
+    mock_file_path = _raw_file()
+    mock_deps["raw_files"].append(mock_file_path)
+    if mock_setup.get("cleaned_exists"):
+        mock_deps["cleaned_files"].append(mock_file_path)
 
     mock_deps["load_raw_data"].return_value = mock_setup.get(
         "load_return", SAMPLE_VIDEO_DATA
@@ -125,7 +157,7 @@ def test_run_skips_videos_for_various_reasons(mock_deps, reason, mock_setup):
 def test_run_handles_critical_exception(mocker, mock_deps):
     """Tests the main try/except block that wraps the loop."""
     # Arrange
-    mock_deps["raw_json_dir"].rglob.side_effect = Exception("Disk read error")
+    mock_deps["iter_json_files"].side_effect = Exception("Disk read error")
     mocker.patch("traceback.format_exc")
 
     # Act & Assert
@@ -138,3 +170,75 @@ def test_run_handles_critical_exception(mocker, mock_deps):
         f"\n!! A critical error occurred. See {mock_deps['logs_dir']} for"
         " details."
     )
+
+
+def test_run_cleans_every_file(mock_deps):
+    """Tests that every raw file is processed by the worker pool."""
+    # Arrange
+    mock_file_paths = [MagicMock() for _ in range(3)]
+    mock_deps["raw_files"].extend(mock_file_paths)
+
+    mock_deps["load_raw_data"].return_value = SAMPLE_VIDEO_DATA
+    mock_deps["check_data_integrity"].return_value = True
+
+    # Act
+    clean_locally.run()
+
+    # Assert
+    assert mock_deps["load_raw_data"].call_count == 3
+    assert mock_deps["save_cleaned_data"].call_count == 3
+
+
+def test_run_reraises_worker_exception(mocker, mock_deps):
+    """Tests that an error inside a worker reaches the critical handler."""
+    # Arrange
+    mock_deps["raw_files"].append(MagicMock())
+    mock_deps["load_raw_data"].side_effect = OSError("Disk read error")
+
+    # Act & Assert
+    with pytest.raises(OSError, match="Disk read error"):
+        clean_locally.run()
+
+    mock_deps["logger"].critical.assert_called()
+    mock_deps["save_cleaned_data"].assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "manifest_entry, should_hash, should_clean",
+    [
+        # Same size and mtime: skipped without hashing
+        (NEW_ENTRY, False, False),
+        # Touched but identical: hashed, skipped, and the stat refreshed
+        ({"sha256": "new", "size": 10, "mtime_ns": 1}, True, False),
+        # Changed contents: hashed and cleaned again
+        ({"sha256": "old", "size": 9, "mtime_ns": 1}, True, True),
+        # Cleaned before the manifest existed: adopted as up to date
+        (None, True, False),
+    ],
+)
+def test_run_uses_manifest_to_detect_changed_files(
+    mock_deps, manifest_entry, should_hash, should_clean
+):
+    """Tests that a cleaned video is redone only if its raw file changed,
+    and that its raw file is only hashed if its size or mtime changed.
+    """
+    # Arrange
+    mock_file_path = _raw_file()
+    mock_deps["raw_files"].append(mock_file_path)
+    manifest_key = mock_file_path.relative_to.return_value.as_posix()
+    manifest = {manifest_key: manifest_entry} if manifest_entry else {}
+    mock_deps["load_manifest"].return_value = manifest
+    # The same mock stands in for the raw file's cleaned counterpart
+    mock_deps["cleaned_files"].append(mock_file_path)
+
+    mock_deps["load_raw_data"].return_value = SAMPLE_VIDEO_DATA
+    mock_deps["check_data_integrity"].return_value = True
+    mock_deps["save_cleaned_data"].return_value = True
+
+    # Act
+    clean_locally.run()
+
+    # Assert
+    assert mock_deps["file_sha256"].called is should_hash
+    assert mock_deps["clean_transcript"].called is should_clean
+    assert manifest == {manifest_key: NEW_ENTRY}
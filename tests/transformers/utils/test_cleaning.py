@@ -3,6 +3,7 @@ from unittest.mock import ANY, MagicMock, call
 import pytest
 
 from kfai.transformers.utils import cleaning as cleaning_utils
+from kfai.transformers.utils.helpers import chunk_cache_key
 
 
 # --- Fixture ---
@@ -19,38 +20,64 @@ def mock_deps(mocker):
     mock_clean_text_chunk = mocker.patch(
         "kfai.transformers.utils.cleaning.clean_text_chunk"
     )
+    mock_needs_cleaning = mocker.patch(
+        "kfai.transformers.utils.cleaning.needs_cleaning", return_value=True
+    )
+    mocker.patch(
+        "kfai.transformers.utils.cleaning.chunk_cache_key",
+        side_effect=lambda user_prompt_prefix, text: f"key:{text}",
+    )
+    mock_load_cached_chunks = mocker.patch(
+        "kfai.transformers.utils.cleaning.load_cached_chunks", return_value={}
+    )
+    mock_save_cached_chunks = mocker.patch(
+        "kfai.transformers.utils.cleaning.save_cached_chunks"
+    )
 
-    # Mock LLM and its invoke method
-    mock_llm = MagicMock()
-    mock_llm.invoke = MagicMock()
+    # Mock the Ollama client
+    mock_client = MagicMock()
 
     # Mock progress bar
     mock_tqdm = mocker.patch("kfai.transformers.utils.cleaning.tqdm")
     mock_progress_bar = mock_tqdm.return_value
 
-    # Mock prompts and json.dumps
+    # Mock prompts and orjson.dumps
     mocker.patch(
         "kfai.transformers.utils.cleaning.SYSTEM_PROMPT", "System prompt."
     )
     mocker.patch(
-        "kfai.transformers.utils.cleaning.USER_PROMPT",
-        "User prompt: {metadata} {chunk}",
+        "kfai.transformers.utils.cleaning.USER_PROMPT_PREFIX",
+        "User prompt: {metadata} ",
     )
-    mocker.patch("json.dumps", return_value="{}")
+    mocker.patch(
+        "kfai.transformers.utils.cleaning.USER_PROMPT_SUFFIX", " Response:"
+    )
+    mock_dumps = mocker.patch("orjson.dumps", return_value=b"{}")
 
     # Mock print for console output
     mock_print = mocker.patch("builtins.print")
+    mock_sleep = mocker.patch("kfai.transformers.utils.cleaning.sleep")
 
     return {
         "clean_response": mock_clean_response,
         "clean_text_chunk": mock_clean_text_chunk,
-        "llm": mock_llm,
+        "needs_cleaning": mock_needs_cleaning,
+        "load_cached_chunks": mock_load_cached_chunks,
+        "save_cached_chunks": mock_save_cached_chunks,
+        "client": mock_client,
         "logger": mock_logger,  # This is now the direct mock of the logger
         "progress_bar": mock_progress_bar,
         "print": mock_print,
+        "sleep": mock_sleep,
+        "dumps": mock_dumps,
     }
 
 
+def _reply(content):
+    """Builds a stand-in for an Ollama chat response."""
+    return MagicMock(message=MagicMock(content=content))
+
+
 # --- Test Data ---
 SAMPLE_VIDEO_RECORD = {
     "id": 1,
@@ -75,14 +102,17 @@ def test_clean_transcript_happy_path(mock_deps):
         "chunk 1 clean",
         "chunk 2 clean",
     ]
-    mock_deps["llm"].invoke.side_effect = ["llm response 1", "llm response 2"]
+    mock_deps["client"].chat.side_effect = [
+        _reply("llm response 1"),
+        _reply("llm response 2"),
+    ]
     mock_deps["clean_response"].side_effect = [
         "cleaned response 1",
         "cleaned response 2",
     ]
 
     cleaned_data = cleaning_utils.clean_transcript(
-        SAMPLE_VIDEO_RECORD, MagicMock(), mock_deps["llm"]
+        SAMPLE_VIDEO_RECORD, MagicMock(), mock_deps["client"]
     )
 
     assert cleaned_data is not None
@@ -91,19 +121,46 @@ def test_clean_transcript_happy_path(mock_deps):
     assert mock_deps["progress_bar"].update.call_count == 2
     mock_deps["progress_bar"].close.assert_called_once()
 
+    first_call = mock_deps["client"].chat.call_args_list[0]
+    assert first_call.kwargs["think"] is False
+    first_messages = first_call.kwargs["messages"]
+    assert first_messages[1]["content"] == (
+        "User prompt: {} chunk 1 clean Response:"
+    )
+
+
+def test_clean_transcript_prompt_metadata(mock_deps):
+    """Only the metadata the prompt refers to is sent to the model."""
+    mock_deps["clean_text_chunk"].side_effect = lambda text: text
+    mock_deps["clean_response"].side_effect = lambda response: response
+    mock_deps["client"].chat.return_value = _reply("llm response")
+
+    cleaning_utils.clean_transcript(
+        SAMPLE_VIDEO_RECORD, MagicMock(), mock_deps["client"]
+    )
+
+    mock_deps["dumps"].assert_called_once_with(
+        {
+            "show_name": "Show A",
+            "hosts": ["Host A"],
+            "title": "Video Title",
+            "description": "Description",
+        }
+    )
+
 
 def test_clean_transcript_llm_call_failure(mock_deps):
     """
     Tests that the function handles an LLM invocation error gracefully.
     """
     # 1. Arrange
-    mock_deps["llm"].invoke.side_effect = Exception("LLM connection error")
+    mock_deps["client"].chat.side_effect = Exception("LLM connection error")
     relative_path_mock = MagicMock()
     relative_path_mock.__str__.return_value = "path/to/video.json"
 
     # 2. Act
     result = cleaning_utils.clean_transcript(
-        SAMPLE_VIDEO_RECORD, relative_path_mock, mock_deps["llm"]
+        SAMPLE_VIDEO_RECORD, relative_path_mock, mock_deps["client"]
     )
 
     # 3. Assert
@@ -124,6 +181,133 @@ def test_clean_transcript_llm_call_failure(mock_deps):
     assert second_error_call == call(ANY)
 
     mock_deps["progress_bar"].close.assert_called_once()
+    assert mock_deps["client"].chat.call_count == 3
+    mock_deps["save_cached_chunks"].assert_called_once_with(ANY, {})
+    assert mock_deps["logger"].warning.call_count == 2
+    # Exponential backoff between attempts, none after the last one
+    assert mock_deps["sleep"].call_args_list == [call(2.0), call(4.0)]
+
+
+def test_clean_transcript_retries_failed_chunk(mock_deps):
+    """A transient LLM error is retried without dropping the video."""
+    mock_deps["clean_text_chunk"].side_effect = lambda text: text
+    mock_deps["client"].chat.side_effect = [
+        _reply("llm response 1"),
+        Exception("LLM timeout"),
+        _reply("llm response 2"),
+    ]
+    mock_deps["clean_response"].side_effect = lambda response: response
+
+    cleaned_data = cleaning_utils.clean_transcript(
+        SAMPLE_VIDEO_RECORD, MagicMock(), mock_deps["client"]
+    )
+
+    assert cleaned_data is not None
+    assert [c["text"] for c in cleaned_data["transcript_chunks"]] == [
+        "llm response 1",
+        "llm response 2",
+    ]
+    assert mock_deps["client"].chat.call_count == 3
+    mock_deps["logger"].warning.assert_called_once()
+    mock_deps["logger"].error.assert_not_called()
+
+
+def test_clean_transcript_skips_llm_for_chunks_without_words(mock_deps):
+    """Chunks with nothing to correct are kept without an LLM call."""
+    mock_deps["clean_text_chunk"].side_effect = ["****", "chunk 2 clean"]
+    mock_deps["needs_cleaning"].side_effect = [False, True]
+    mock_deps["client"].chat.return_value = _reply("llm response 2")
+    mock_deps["clean_response"].side_effect = lambda response: response
+
+    cleaned_data = cleaning_utils.clean_transcript(
+        SAMPLE_VIDEO_RECORD, MagicMock(), mock_deps["client"]
+    )
+
+    assert cleaned_data["transcript_chunks"] == [
+        {"text": "****", "start": 10.0},
+        {"text": "llm response 2", "start": 20.0},
+    ]
+    mock_deps["client"].chat.assert_called_once()
+    assert mock_deps["progress_bar"].update.call_count == 2
+
+
+def test_clean_transcript_serves_cached_chunks(mock_deps):
+    """Cached chunks skip the LLM and new responses are saved once."""
+    mock_deps["clean_text_chunk"].side_effect = ["intro", "chunk 2 clean"]
+    mock_deps["load_cached_chunks"].return_value = {"key:intro": "Intro."}
+    mock_deps["client"].chat.return_value = _reply("llm response 2")
+    mock_deps["clean_response"].side_effect = lambda response: response
+
+    cleaned_data = cleaning_utils.clean_transcript(
+        SAMPLE_VIDEO_RECORD, MagicMock(), mock_deps["client"]
+    )
+
+    assert cleaned_data["transcript_chunks"] == [
+        {"text": "Intro.", "start": 10.0},
+        {"text": "llm response 2", "start": 20.0},
+    ]
+    mock_deps["client"].chat.assert_called_once()
+    mock_deps["load_cached_chunks"].assert_called_once_with(
+        ANY, ["key:intro", "key:chunk 2 clean"]
+    )
+    mock_deps["save_cached_chunks"].assert_called_once_with(
+        ANY, {"key:chunk 2 clean": "llm response 2"}
+    )
+
+
+def test_clean_transcript_reuses_repeated_chunk(mocker, mock_deps):
+    """A chunk repeated within a video is only sent to the LLM once, but
+    another video with different metadata doesn't share its entry.
+    """
+    mocker.patch(
+        "kfai.transformers.utils.cleaning.chunk_cache_key",
+        side_effect=chunk_cache_key,
+    )
+    mock_deps["clean_text_chunk"].side_effect = lambda text: "same"
+    mock_deps["client"].chat.return_value = _reply("Same.")
+    mock_deps["clean_response"].side_effect = lambda response: response
+    mock_deps["dumps"].side_effect = lambda obj, **_: repr(obj).encode()
+
+    cleaned_data = cleaning_utils.clean_transcript(
+        SAMPLE_VIDEO_RECORD, MagicMock(), mock_deps["client"]
+    )
+
+    assert [c["text"] for c in cleaned_data["transcript_chunks"]] == [
+        "Same.",
+        "Same.",
+    ]
+    mock_deps["client"].chat.assert_called_once()
+
+    # The first video's entries are now in the cache
+    saved_entries = mock_deps["save_cached_chunks"].call_args.args[1]
+    mock_deps["load_cached_chunks"].side_effect = lambda path, keys: {
+        key: saved_entries[key] for key in keys if key in saved_entries
+    }
+    other_video = SAMPLE_VIDEO_RECORD | {"hosts": ["Host B"]}
+
+    cleaning_utils.clean_transcript(
+        other_video, MagicMock(), mock_deps["client"]
+    )
+
+    assert mock_deps["client"].chat.call_count == 2
+
+
+def test_clean_transcript_does_not_cache_empty_response(mock_deps):
+    """An empty LLM response is kept for the integrity check to reject,
+    but isn't cached, so the chunk is sent to the LLM again next run.
+    """
+    mock_deps["clean_text_chunk"].side_effect = ["chunk 1", "chunk 2"]
+    mock_deps["client"].chat.side_effect = [_reply(None), _reply("Two.")]
+    mock_deps["clean_response"].side_effect = lambda response: response
+
+    cleaned_data = cleaning_utils.clean_transcript(
+        SAMPLE_VIDEO_RECORD, MagicMock(), mock_deps["client"]
+    )
+
+    assert cleaned_data["transcript_chunks"][0] == {"text": "", "start": 10.0}
+    mock_deps["save_cached_chunks"].assert_called_once_with(
+        ANY, {"key:chunk 2": "Two."}
+    )
 
 
 def test_clean_transcript_general_failure(mock_deps):
@@ -137,7 +321,7 @@ def test_clean_transcript_general_failure(mock_deps):
 
     # 2. Act
     result = cleaning_utils.clean_transcript(
-        malformed_record, relative_path_mock, mock_deps["llm"]
+        malformed_record, relative_path_mock, mock_deps["client"]
     )
 
     # 3. Assert
@@ -1,6 +1,8 @@
-import json
-from unittest.mock import ANY, MagicMock
+import hashlib
+import time
+from unittest.mock import MagicMock
 
+import orjson
 import pytest
 
 from kfai.transformers.utils import helpers as helpers_utils
@@ -26,7 +28,7 @@ def test_load_raw_data_happy_path(mocker):
 
 
 @pytest.mark.parametrize(
-    "error", [json.JSONDecodeError("msg", "doc", 0), OSError("msg")]
+    "error", [orjson.JSONDecodeError("msg", "doc", 0), OSError("msg")]
 )
 def test_load_raw_data_handles_errors(mocker, error):
     """Tests that file read or JSON parsing errors are caught and logged."""
@@ -55,11 +57,17 @@ def sample_data():
     """Provides sample raw and cleaned data for integrity checks."""
     raw = {
         "video_id": "v1",
-        "transcript_chunks": [{"text": "a"}, {"text": "b"}],
+        "transcript_chunks": [
+            {"text": "tim geddes", "start": 0.0},
+            {"text": "[Music]", "start": 5.0},
+        ],
     }
     cleaned = {
         "video_id": "v1",
-        "transcript_chunks": [{"text": "c"}, {"text": "d"}],
+        "transcript_chunks": [
+            {"text": "Tim Gettys", "start": 0.0},
+            {"text": "", "start": 5.0},
+        ],
     }
     return raw, cleaned
 
@@ -80,16 +88,26 @@ def test_check_data_integrity_fails_on_empty_data(mocker, sample_data):
     mock_logger.warning.assert_called_once()
 
 
-def test_check_data_integrity_fails_on_key_mismatch(mocker, sample_data):
-    """Tests failure when keys don't match between raw and cleaned data."""
-    raw, _ = sample_data
-    cleaned_mismatch = {"video_id": "v1"}  # Missing transcript_chunks key
+@pytest.mark.parametrize(
+    "cleaned_chunk",
+    [
+        # The LLM returned nothing for a chunk with words in it
+        {"text": "", "start": 0.0},
+        # The chunk no longer lines up with its raw counterpart
+        {"text": "Tim Gettys", "start": 5.0},
+    ],
+)
+def test_check_data_integrity_fails_on_bad_chunk(
+    mocker, sample_data, cleaned_chunk
+):
+    """Tests failure when a cleaned chunk is empty or out of place."""
+    raw, cleaned = sample_data
+    cleaned["transcript_chunks"][0] = cleaned_chunk
     mock_logger = mocker.patch("kfai.transformers.utils.helpers.logger")
     assert (
-        helpers_utils.check_data_integrity(raw, cleaned_mismatch, MagicMock())
-        is False
+        helpers_utils.check_data_integrity(raw, cleaned, MagicMock()) is False
     )
-    mock_logger.warning.assert_called_once()
+    mock_logger.error.assert_called_once()
 
 
 def test_check_data_integrity_fails_on_chunk_count_mismatch(
@@ -118,7 +136,6 @@ def test_save_cleaned_data_happy_path(mocker):
     mock_path.parent = mock_parent_dir
     mock_open = mocker.mock_open()
     mocker.patch.object(mock_path, "open", mock_open)
-    mock_dump = mocker.patch("json.dump")
 
     # Act
     result = helpers_utils.save_cleaned_data(mock_path, {"video_id": "v1"})
@@ -126,7 +143,24 @@ def test_save_cleaned_data_happy_path(mocker):
     # Assert
     assert result is True
     mock_parent_dir.mkdir.assert_called_once_with(parents=True, exist_ok=True)
-    mock_dump.assert_called_once_with({"video_id": "v1"}, ANY, indent=4)
+    mock_open.assert_called_once_with("wb")
+    mock_open().write.assert_called_once_with(
+        orjson.dumps({"video_id": "v1"}, option=orjson.OPT_INDENT_2)
+    )
+
+
+def test_save_cleaned_data_creates_each_directory_once(mocker):
+    """Tests that a directory is only created for its first file."""
+    mock_parent_dir = MagicMock()
+    mocker.patch.object(helpers_utils, "_created_dirs", set())
+    for _ in range(2):
+        mock_path = MagicMock()
+        mock_path.parent = mock_parent_dir
+        mocker.patch.object(mock_path, "open", mocker.mock_open())
+
+        assert helpers_utils.save_cleaned_data(mock_path, {}) is True
+
+    mock_parent_dir.mkdir.assert_called_once_with(parents=True, exist_ok=True)
 
 
 def test_save_cleaned_data_handles_exception(mocker):
@@ -148,6 +182,158 @@ def test_save_cleaned_data_handles_exception(mocker):
     )
 
 
+# --- Tests for the cleaning manifest ---
+
+
+def test_file_sha256(tmp_path):
+    """Tests that the digest matches hashlib's SHA-256 of the contents."""
+    file_path = tmp_path / "video.json"
+    file_path.write_bytes(b'{"video_id": "v1"}')
+
+    assert helpers_utils.file_sha256(file_path) == (
+        hashlib.sha256(b'{"video_id": "v1"}').hexdigest()
+    )
+
+
+def test_manifest_round_trip(tmp_path):
+    """Tests that a saved manifest loads back unchanged."""
+    manifest_path = tmp_path / "data" / "manifest.json"
+
+    manifest = {
+        "2024/01/v1.json": {"sha256": "abc", "size": 10, "mtime_ns": 2}
+    }
+
+    helpers_utils.save_manifest(manifest_path, manifest)
+
+    assert helpers_utils.load_manifest(manifest_path) == manifest
+
+
+def test_load_manifest_upgrades_digest_only_entries(tmp_path):
+    """Tests that older digest-only entries get a stat that never matches."""
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_bytes(b'{"2024/01/v1.json": "abc"}')
+
+    assert helpers_utils.load_manifest(manifest_path) == {
+        "2024/01/v1.json": {"sha256": "abc", "size": -1, "mtime_ns": -1}
+    }
+
+
+def test_load_manifest_missing_file(tmp_path):
+    """Tests that a missing manifest starts empty."""
+    assert helpers_utils.load_manifest(tmp_path / "missing.json") == {}
+
+
+def test_load_manifest_corrupt_file(mocker, tmp_path):
+    """Tests that an unreadable manifest is logged and starts empty."""
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_bytes(b"{not json")
+    mock_logger = mocker.patch("kfai.transformers.utils.helpers.logger")
+
+    assert helpers_utils.load_manifest(manifest_path) == {}
+    mock_logger.warning.assert_called_once()
+
+
+def test_save_manifest_handles_exception(mocker):
+    """Tests that a failed manifest write is caught and logged."""
+    mock_path = MagicMock()
+    mocker.patch.object(mock_path, "open", side_effect=OSError("Disk full"))
+    mock_logger = mocker.patch("kfai.transformers.utils.helpers.logger")
+    mocker.patch("traceback.format_exc")
+
+    helpers_utils.save_manifest(mock_path, {})
+
+    assert mock_logger.error.call_count == 2
+
+
+# --- Tests for the chunk cache ---
+
+
+def test_chunk_cache_key_depends_on_model(mocker):
+    """Tests that keys are stable per text and change with the model."""
+    key = helpers_utils.chunk_cache_key("prefix", "hello there")
+
+    assert key == helpers_utils.chunk_cache_key("prefix", "hello there")
+    assert key != helpers_utils.chunk_cache_key("prefix", "hello")
+    assert len(key) == 32
+
+    mocker.patch("kfai.transformers.utils.helpers.CLEANING_MODEL", "other")
+    assert key != helpers_utils.chunk_cache_key("prefix", "hello there")
+
+
+def test_chunk_cache_key_depends_on_rendered_prefix():
+    """Tests that the same text under different metadata gets a new key."""
+    assert helpers_utils.chunk_cache_key(
+        'METADATA: {"hosts":["Greg Miller"]}', "hello there"
+    ) != helpers_utils.chunk_cache_key(
+        'METADATA: {"hosts":["Tim Gettys"]}', "hello there"
+    )
+
+
+@pytest.mark.parametrize(
+    "name, value",
+    [
+        ("SYSTEM_PROMPT", "A different system prompt"),
+        ("USER_PROMPT_SUFFIX", "\nCLEANED:\n"),
+        ("CLEANING_OPTIONS", {"temperature": 0.5}),
+    ],
+)
+def test_chunk_cache_key_depends_on_prompt_and_options(mocker, name, value):
+    """Tests that changing a prompt template or option changes the key."""
+    key = helpers_utils.chunk_cache_key("prefix", "hello there")
+
+    mocker.patch(f"kfai.transformers.utils.helpers.{name}", value)
+
+    assert key != helpers_utils.chunk_cache_key("prefix", "hello there")
+
+
+def test_chunk_cache_round_trip(tmp_path):
+    """Tests that saved chunks load back and unknown keys are omitted."""
+    cache_path = tmp_path / "data" / "chunk_cache.sqlite"
+
+    assert helpers_utils.load_cached_chunks(cache_path, ["a"]) == {}
+    helpers_utils.save_cached_chunks(cache_path, {"a": "A.", "b": "B."})
+    helpers_utils.save_cached_chunks(cache_path, {"a": "A!"})
+
+    assert helpers_utils.load_cached_chunks(cache_path, ["a", "c", "a"]) == {
+        "a": "A!"
+    }
+
+
+def test_load_cached_chunks_batches_keys(mocker, tmp_path):
+    """Tests that keys are looked up in batches under the variable limit."""
+    cache_path = tmp_path / "cache.sqlite"
+    mocker.patch.object(helpers_utils, "CHUNK_CACHE_MAX_VARIABLES", 2)
+    helpers_utils.save_cached_chunks(cache_path, {"a": "A.", "c": "C."})
+
+    assert helpers_utils.load_cached_chunks(
+        cache_path, ["a", "b", "c", "a"]
+    ) == {"a": "A.", "c": "C."}
+
+
+def test_save_cached_chunks_skips_empty(mocker, tmp_path):
+    """Tests that nothing is opened when there are no new chunks."""
+    mock_connect = mocker.patch(
+        "kfai.transformers.utils.helpers._connect_chunk_cache"
+    )
+
+    helpers_utils.save_cached_chunks(tmp_path / "cache.sqlite", {})
+
+    mock_connect.assert_not_called()
+
+
+def test_chunk_cache_handles_database_errors(mocker, tmp_path):
+    """Tests that cache failures are logged and never raised."""
+    cache_path = tmp_path / "cache.sqlite"
+    cache_path.write_bytes(b"not a database")
+    mock_logger = mocker.patch("kfai.transformers.utils.helpers.logger")
+
+    assert helpers_utils.load_cached_chunks(cache_path, ["a"]) == {}
+    helpers_utils.save_cached_chunks(cache_path, {"a": "A."})
+
+    assert mock_logger.warning.call_count == 2
+    assert mock_logger.error.call_count == 2
+
+
 # --- Tests for clean_text_chunk (Pure Function) ---
 
 
@@ -165,12 +351,36 @@ def test_save_cleaned_data_handles_exception(mocker):
         ("Text with >> arrows", "Text with arrows"),
         ("Text [with bracket tags] and content", "Text and content"),
         ("Text with   multiple   spaces", "Text with multiple spaces"),
+        ("What the [\xa0__\xa0] >> [Music] is  that", "What the **** is that"),
+        ("It’s “fine”\u200b", 'It\'s "fine"'),
+        ("[ unclosed" + " " * 5000 + "tag", "[ unclosed tag"),
     ],
 )
 def test_clean_text_chunk(input_text, expected_output):
     assert helpers_utils.clean_text_chunk(input_text) == expected_output
 
 
+# --- Tests for needs_cleaning (Pure Function) ---
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("", False),
+        ("****", False),
+        ("1, 2, 3 ****", False),
+        ("Tim Geddes", True),
+        ("ok", False),
+        ("café", True),
+        ("Yeah, right. Mm-hmm.", False),
+        ("oh wow", False),
+        ("yeah tim", True),
+    ],
+)
+def test_needs_cleaning(text, expected):
+    assert helpers_utils.needs_cleaning(text) is expected
+
+
 # --- Tests for clean_response (Pure Function) ---
 
 
@@ -179,6 +389,11 @@ def test_clean_text_chunk(input_text, expected_output):
     [
         ("Here is the cleaned chunk:Cleaned text", "Cleaned text"),
         ("Here's the cleaned chunk:Cleaned text", "Cleaned text"),
+        (
+            "Here is the cleaned chunk:\nDraft\n"
+            "Here's the cleaned chunk: Final",
+            "Final",
+        ),
         ("<think>Thought process</think>Cleaned text", "Cleaned text"),
         ("<CHUNK>Cleaned text</CHUNK>", "Cleaned text"),
         (
@@ -190,3 +405,17 @@ def test_clean_text_chunk(input_text, expected_output):
 )
 def test_clean_response(input_text, expected_output):
     assert helpers_utils.clean_response(input_text) == expected_output
+
+
+def test_clean_response_long_response_without_preamble():
+    """Tests that a long, marker-free response is returned unchanged
+    without the preamble pattern rescanning it from every offset.
+    """
+    response = "word " * 20_000 + "end"
+
+    start = time.perf_counter()
+    result = helpers_utils.clean_response(response)
+    elapsed = time.perf_counter() - start
+
+    assert result == response
+    assert elapsed < 0.5